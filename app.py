@@ -1,17 +1,36 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash, send_file, send_from_directory
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash, send_file, send_from_directory, Response, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from flask_migrate import Migrate
+from sqlalchemy import and_, case, delete, event, false, func, insert, or_, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.exc import StaleDataError
 from datetime import datetime, timedelta, timezone
 import os
 from dotenv import load_dotenv
-from openai import OpenAI
 import markdown
 import json
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
-import PyPDF2  # Import PyPDF2 for PDF text extraction
+import pdf_extraction
+from llm_cache import LLMCache
+from text_chunking import chunk_text
+from static_assets import load_static_assets
+from llm_gateway import LLMGateway, OpenAITransport, LLMUnavailableError, CircuitBreaker
 import io
+import re
+import gzip
+import tempfile
+import base64
+import hashlib
+import sqlite3
+import time
+import threading
+import uuid
+import click
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image, ImageDraw, ImageFont, ImageColor  # For PWA icon generation
 
 # Load environment variables
@@ -19,10 +38,65 @@ load_dotenv()
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'default-secret-key')
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///learning.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///learning.db').replace('postgres://', 'postgresql://', 1)
+app.config['SQLITE_BUSY_TIMEOUT'] = int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000))  # Milliseconds a writer waits for the lock
+app.config['SQLITE_MMAP_SIZE'] = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))  # Bytes of the file to memory-map
+app.config['SQLITE_CACHE_SIZE'] = int(os.getenv('SQLITE_CACHE_SIZE', -64000))  # Pages, or KiB when negative
+app.config['DB_POOL_SIZE'] = int(os.getenv('DB_POOL_SIZE', 10))  # Connections kept open per process
+app.config['DB_MAX_OVERFLOW'] = int(os.getenv('DB_MAX_OVERFLOW', 10))  # Extra connections allowed under burst
+app.config['DB_POOL_TIMEOUT'] = float(os.getenv('DB_POOL_TIMEOUT', 10))  # Seconds to wait for a free connection
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['UPLOAD_CHUNK_SIZE'] = 64 * 1024  # Bytes read per step while hashing an upload
+app.config['DOWNLOAD_OFFLOAD'] = os.getenv('DOWNLOAD_OFFLOAD', '')  # '', 'x-accel' (nginx) or 'x-sendfile' (Apache/lighttpd)
+app.config['X_ACCEL_PREFIX'] = os.getenv('X_ACCEL_PREFIX', '/protected-uploads/')  # internal nginx location aliased to UPLOAD_FOLDER
+app.config['USE_X_SENDFILE'] = app.config['DOWNLOAD_OFFLOAD'] == 'x-sendfile'  # Flask's send_file emits X-Sendfile instead of the body
+app.config['INGESTION_WORKERS'] = int(os.getenv('INGESTION_WORKERS', 2))  # Background syllabus ingestion threads
+app.config['PDF_EXTRACT_WORKERS'] = int(os.getenv('PDF_EXTRACT_WORKERS', os.cpu_count() or 1))  # Processes used for large PDFs
+app.config['PDF_EXTRACT_PAGE_TIMEOUT'] = float(os.getenv('PDF_EXTRACT_PAGE_TIMEOUT', 30))  # Seconds allowed per page
+app.config['PDF_EXTRACT_SERIAL_MAX_PAGES'] = int(os.getenv('PDF_EXTRACT_SERIAL_MAX_PAGES', 20))  # Smaller PDFs are extracted in-process
+app.config['INGESTION_HEARTBEAT_INTERVAL'] = int(os.getenv('INGESTION_HEARTBEAT_INTERVAL', 15))  # Seconds between liveness updates for this process's jobs
+app.config['INGESTION_STALE_AFTER'] = int(os.getenv('INGESTION_STALE_AFTER', 60))  # Seconds without a heartbeat before another process takes a job over
+app.config['LLM_TIMEOUTS'] = {  # Seconds per call site
+    'chat': 60,
+    'syllabus_summary': 180,
+    'notes': 180,
+    'assignment': 240,
+    'grading': 60,
+    'study_plan': 180,
+    'files': 15,
+}
+app.config['LLM_MAX_RETRIES'] = int(os.getenv('LLM_MAX_RETRIES', 3))  # Retries on 429/5xx/connection errors
+app.config['LLM_MAX_IN_FLIGHT'] = int(os.getenv('LLM_MAX_IN_FLIGHT', 16))  # Concurrent upstream requests per process
+app.config['LLM_ACQUIRE_TIMEOUT'] = float(os.getenv('LLM_ACQUIRE_TIMEOUT', 5))  # Seconds to wait for a free slot
+app.config['LLM_BREAKER_THRESHOLD'] = int(os.getenv('LLM_BREAKER_THRESHOLD', 5))  # Consecutive failures that open the circuit
+app.config['LLM_BREAKER_RESET'] = float(os.getenv('LLM_BREAKER_RESET', 30))  # Seconds before a trial call is let through
+app.config['LLM_CACHE_ENABLED'] = os.getenv('LLM_CACHE_ENABLED', '1') == '1'
+app.config['LLM_CACHE_PATH'] = os.getenv('LLM_CACHE_PATH', os.path.join(app.instance_path, 'llm_cache.db'))  # Empty for memory only
+app.config['LLM_CACHE_TTL'] = int(os.getenv('LLM_CACHE_TTL', 7 * 24 * 3600))  # Seconds
+app.config['LLM_CACHE_MAX_ENTRIES'] = int(os.getenv('LLM_CACHE_MAX_ENTRIES', 1024))  # In-process LRU size
+app.config['LLM_CACHE_DISK_MAX_ENTRIES'] = int(os.getenv('LLM_CACHE_DISK_MAX_ENTRIES', 50000))
+app.config['LLM_CACHE_BYPASS_ROUTES'] = set(filter(None, os.getenv('LLM_CACHE_BYPASS_ROUTES', '').split(',')))  # e.g. "chat,study_plan"
+app.config['LLM_CHUNK_TOKENS'] = int(os.getenv('LLM_CHUNK_TOKENS', 12000))  # Larger inputs are split and processed per chunk
+app.config['LLM_MAP_WORKERS'] = int(os.getenv('LLM_MAP_WORKERS', 4))  # Concurrent per-chunk calls across all requests
+app.config['LLM_JSON_RETRIES'] = int(os.getenv('LLM_JSON_RETRIES', 1))  # Extra attempts for a chunk whose JSON reply does not parse
+app.config['MARKDOWN_CACHE_SIZE'] = int(os.getenv('MARKDOWN_CACHE_SIZE', 512))  # Rendered documents kept in memory
+app.config['GRADING_MAX_WORKERS'] = int(os.getenv('GRADING_MAX_WORKERS', 8))  # Concurrent AI grading calls across all submissions
+app.config['GRADING_TIMEOUT'] = float(os.getenv('GRADING_TIMEOUT', 120))  # Seconds to wait for a single AI grade
+app.config['AGGREGATE_CACHE_SIZE'] = int(os.getenv('AGGREGATE_CACHE_SIZE', 2048))  # Cached dashboard/calendar aggregates
+app.config['AGGREGATE_CACHE_TTL'] = float(os.getenv('AGGREGATE_CACHE_TTL', 300))  # Seconds an unchanged aggregate is kept
+app.config['LIST_PAGE_SIZE'] = int(os.getenv('LIST_PAGE_SIZE', 20))  # Rows per page on listing pages
+app.config['LIST_MAX_PAGE_SIZE'] = int(os.getenv('LIST_MAX_PAGE_SIZE', 100))  # Upper bound for ?per_page=
+app.config['CLEANUP_MAX_ATTEMPTS'] = int(os.getenv('CLEANUP_MAX_ATTEMPTS', 5))  # Tries per file/upstream cleanup step
+app.config['CLEANUP_RETRY_DELAY'] = float(os.getenv('CLEANUP_RETRY_DELAY', 2))  # Seconds before the first retry; doubles each time
+app.config['COMPRESS_ENABLED'] = os.getenv('COMPRESS_ENABLED', '1') == '1'  # Turn off when a proxy in front compresses
+app.config['COMPRESS_MIN_SIZE'] = int(os.getenv('COMPRESS_MIN_SIZE', 1024))  # Smaller bodies are sent as-is
+app.config['COMPRESS_LEVEL'] = int(os.getenv('COMPRESS_LEVEL', 6))  # gzip level, 1 (fastest) to 9 (smallest)
+app.config['COMPRESS_MIMETYPES'] = {
+    'text/html', 'text/plain', 'text/css', 'text/javascript', 'application/javascript',
+    'application/json', 'image/svg+xml',
+}
 ALLOWED_EXTENSIONS = {'pdf'}
 
 # Ensure upload directory exists
@@ -32,6 +106,36 @@ os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs(os.path.join('static', 'images'), exist_ok=True)
 os.makedirs(os.path.join('static', 'js'), exist_ok=True)
 
+def database_engine_options(uri):
+    """Pool settings for SQLALCHEMY_ENGINE_OPTIONS. In-memory SQLite uses a
+    single shared connection, so it keeps SQLAlchemy's default pool."""
+    if uri.startswith('sqlite') and (':memory:' in uri or uri.rstrip('/') == 'sqlite:'):
+        return {}
+    options = {
+        'pool_size': app.config['DB_POOL_SIZE'],
+        'max_overflow': app.config['DB_MAX_OVERFLOW'],
+        'pool_timeout': app.config['DB_POOL_TIMEOUT'],
+    }
+    if not uri.startswith('sqlite'):
+        options['pool_pre_ping'] = True  # Drop connections the server closed while idle
+    return options
+
+app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', database_engine_options(app.config['SQLALCHEMY_DATABASE_URI']))
+
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers proceed while a write is in progress; writers wait on
+    # busy_timeout instead of failing immediately with "database is locked"
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute(f"PRAGMA busy_timeout={app.config['SQLITE_BUSY_TIMEOUT']}")
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute(f"PRAGMA mmap_size={app.config['SQLITE_MMAP_SIZE']}")
+    cursor.execute(f"PRAGMA cache_size={app.config['SQLITE_CACHE_SIZE']}")
+    cursor.close()
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
@@ -41,19 +145,195 @@ migrate = Migrate(app, db)
 login_manager = LoginManager(app)
 login_manager.login_view = 'login'
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+# Initialize the LLM gateway, which owns the OpenAI connection pool, retries and circuit breaker
+llm = LLMGateway(
+    OpenAITransport(api_key=os.getenv('OPENAI_API_KEY'), max_connections=app.config['LLM_MAX_IN_FLIGHT']),
+    timeouts=app.config['LLM_TIMEOUTS'],
+    max_retries=app.config['LLM_MAX_RETRIES'],
+    max_in_flight=app.config['LLM_MAX_IN_FLIGHT'],
+    acquire_timeout=app.config['LLM_ACQUIRE_TIMEOUT'],
+    breaker=CircuitBreaker(app.config['LLM_BREAKER_THRESHOLD'], app.config['LLM_BREAKER_RESET'])
+)
+
+# Initialize LLM response cache
+if app.config['LLM_CACHE_PATH']:
+    os.makedirs(os.path.dirname(app.config['LLM_CACHE_PATH']) or '.', exist_ok=True)
+llm_cache = LLMCache(
+    path=app.config['LLM_CACHE_PATH'] or None,
+    ttl=app.config['LLM_CACHE_TTL'],
+    max_entries=app.config['LLM_CACHE_MAX_ENTRIES'],
+    disk_max_entries=app.config['LLM_CACHE_DISK_MAX_ENTRIES']
+)
+
+def llm_cache_enabled(route, cache=True):
+    return cache and app.config['LLM_CACHE_ENABLED'] and route not in app.config['LLM_CACHE_BYPASS_ROUTES']
+
+def complete_chat(route, model, messages, response_format=None, cache=True):
+    """Return the completion text for a chat request, served from the LLM cache when possible.
+
+    ``route`` names the call site so its caching can be switched off with
+    LLM_CACHE_BYPASS_ROUTES; ``cache=False`` opts a single call out.
+    """
+    use_cache = llm_cache_enabled(route, cache)
+    if use_cache:
+        key = LLMCache.make_key(model, messages, response_format)
+        content = llm_cache.get(key)
+        if content is not None:
+            return content
+    
+    request_args = {"model": model, "messages": messages}
+    if response_format:
+        request_args["response_format"] = response_format
+    response = llm.chat_completion(route, **request_args)
+    content = response.choices[0].message.content
+    
+    if use_cache and content:
+        # Never cache a malformed structured response, so a retry can succeed
+        if response_format and response_format.get("type") == "json_object":
+            try:
+                json.loads(content)
+            except json.JSONDecodeError:
+                return content
+        llm_cache.set(key, content)
+    return content
+
+map_executor = ThreadPoolExecutor(max_workers=app.config['LLM_MAP_WORKERS'], thread_name_prefix='llm-map')
+
+def is_valid_json(content):
+    try:
+        json.loads(content)
+    except (TypeError, json.JSONDecodeError):
+        return False
+    return True
+
+def complete_chunk(route, messages, response_format=None):
+    """Run one map-step request, asking again when a structured reply is not valid JSON."""
+    content = complete_chat(route, model="o4-mini", messages=messages, response_format=response_format)
+    if response_format and response_format.get("type") == "json_object":
+        for _ in range(app.config['LLM_JSON_RETRIES']):
+            if is_valid_json(content):
+                break
+            print(f"Invalid JSON from the {route} call; requesting the chunk again")
+            content = complete_chat(route, model="o4-mini", messages=messages, response_format=response_format, cache=False)
+    return content
+
+def complete_chunked(route, system_prompt, text, response_format=None):
+    """Map step: run the prompt over each token-bounded chunk of text concurrently.
+
+    Returns the completion text for every chunk, in document order. Text that
+    fits in one chunk is sent as a single request, exactly as before. With a
+    json_object response format, a chunk whose reply does not parse is
+    requested again up to LLM_JSON_RETRIES times.
+    """
+    chunks = chunk_text(text, app.config['LLM_CHUNK_TOKENS']) or [text]
+    if len(chunks) == 1:
+        return [complete_chunk(
+            route,
+            [{"role": "system", "content": system_prompt}, {"role": "user", "content": text}],
+            response_format
+        )]
+    
+    futures = [
+        map_executor.submit(
+            complete_chunk,
+            route,
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": f"(Part {number} of {len(chunks)} of the syllabus)\n\n{chunk}"}
+            ],
+            response_format
+        )
+        for number, chunk in enumerate(chunks, start=1)
+    ]
+    return [future.result() for future in futures]
+
+def merge_subtopic(merged, subtopic):
+    """Fold a repeated subtopic into the first one: lists are concatenated, text joined by paragraph."""
+    for field, value in subtopic.items():
+        if field == 'title' or not value:
+            continue
+        existing = merged.get(field)
+        if not existing:
+            merged[field] = value
+        elif isinstance(existing, list) and isinstance(value, list):
+            merged[field] = existing + value
+        elif isinstance(existing, str) and isinstance(value, str) and value != existing:
+            merged[field] = f"{existing}\n\n{value}"
+
+def merge_topic_responses(responses):
+    """Reduce step: merge per-chunk topics[].subtopics[] JSON into one structure.
+
+    Topics and subtopics with the same title (ignoring case) are combined; see
+    merge_subtopic. Top-level fields such as title and description come from
+    the first chunk. Returns None unless every chunk parsed, so a partial set
+    of notes or questions is never saved.
+    """
+    merged = None
+    topics = {}
+    for content in responses:
+        try:
+            part = json.loads(content)
+        except (TypeError, json.JSONDecodeError) as json_err:
+            print(f"JSON parsing error: {json_err}")
+            return None
+        if merged is None:
+            merged = {key: value for key, value in part.items() if key != 'topics'}
+        
+        for topic in part.get('topics', []):
+            topic_key = topic['title'].strip().lower()
+            if topic_key not in topics:
+                topics[topic_key] = {**topic, 'subtopics': []}
+            subtopics = {subtopic['title'].strip().lower(): subtopic for subtopic in topics[topic_key]['subtopics']}
+            for subtopic in topic.get('subtopics', []):
+                subtopic_key = subtopic['title'].strip().lower()
+                if subtopic_key not in subtopics:
+                    subtopics[subtopic_key] = dict(subtopic)
+                    topics[topic_key]['subtopics'].append(subtopics[subtopic_key])
+                else:
+                    merge_subtopic(subtopics[subtopic_key], subtopic)
+    
+    if merged is None:
+        return None
+    merged['topics'] = list(topics.values())
+    return merged
+
+# Markdown rendering
+# Notes and syllabus content are rendered once at write time into content_html;
+# the filter's content-hash LRU covers anything not yet stored.
+markdown_renderers = threading.local()
+markdown_cache = OrderedDict()
+markdown_cache_lock = threading.Lock()
+
+def markdown_to_html(text):
+    # Markdown instances are not thread-safe, so each thread reuses its own
+    renderer = getattr(markdown_renderers, 'renderer', None)
+    if renderer is None:
+        renderer = markdown_renderers.renderer = markdown.Markdown(extensions=['extra', 'nl2br', 'sane_lists'])
+    return renderer.reset().convert(text) if text else ""
 
 # Register markdown filter
 @app.template_filter('markdown')
 def render_markdown(text):
     if text:
-        return markdown.markdown(text, extensions=['extra', 'nl2br', 'sane_lists'])
+        key = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        with markdown_cache_lock:
+            html = markdown_cache.get(key)
+            if html is not None:
+                markdown_cache.move_to_end(key)
+                return html
+        html = markdown_to_html(text)
+        with markdown_cache_lock:
+            markdown_cache[key] = html
+            while len(markdown_cache) > app.config['MARKDOWN_CACHE_SIZE']:
+                markdown_cache.popitem(last=False)
+        return html
     return ""
 
 # Register fromjson filter for parsing JSON strings
 @app.template_filter('fromjson')
 def parse_json(value):
+    if isinstance(value, (dict, list)):
+        return value
     if value:
         try:
             return json.loads(value)
@@ -67,6 +347,7 @@ class User(UserMixin, db.Model):
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password = db.Column(db.String(120), nullable=False)
+    data_version = db.Column(db.Integer, nullable=False, default=0)  # Bumped with every write to the user's rows; see invalidate_user_aggregates
     syllabi = db.relationship('Syllabus', backref='user', lazy=True)
     assignments = db.relationship('Assignment', backref='user', lazy=True)
     todos = db.relationship('Todo', backref='user', lazy=True)
@@ -76,21 +357,39 @@ class Syllabus(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     content = db.Column(db.Text)
+    content_html = db.Column(db.Text)  # content rendered from Markdown at write time
     file_path = db.Column(db.String(255))  # Store the path to the uploaded PDF
     openai_file_id = db.Column(db.String(255))  # Store the OpenAI file ID
+    extracted_text = db.Column(db.Text)  # Raw PDF text, extracted once at upload time
+    content_hash = db.Column(db.String(64), index=True)  # SHA-256 of the uploaded PDF; names its file in the upload store
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    status = db.Column(db.String(20), nullable=False, default='ready')  # pending, extracting, summarizing, ready, failed
+    status_error = db.Column(db.Text)  # Reason the last ingestion job failed
+    status_updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    job_owner = db.Column(db.String(64))  # Process that queued or is running the ingestion job; see ingestion_owner
+    job_heartbeat_at = db.Column(db.DateTime)  # Last liveness update from job_owner while the job is unfinished
+    notes_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Bumped each time notes are generated
+    version_id = db.Column(db.Integer, nullable=False, default=1)  # Bumped on every write; see lock_unchanged_row
     notes = db.relationship('Note', backref='syllabus', lazy=True)
+    __table_args__ = (
+        db.Index('ix_syllabus_user_id_created_at', 'user_id', 'created_at'),
+    )
+    __mapper_args__ = {'version_id_col': version_id}
 
 class Note(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     content = db.Column(db.Text, nullable=False)
+    content_html = db.Column(db.Text)  # content rendered from Markdown at write time
     syllabus_id = db.Column(db.Integer, db.ForeignKey('syllabus.id'), nullable=False)
     topic = db.Column(db.String(200))
     subtopic = db.Column(db.String(200))
     order = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    __table_args__ = (
+        db.Index('ix_note_syllabus_id_order', 'syllabus_id', 'order'),
+    )
 
 class Question(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -98,12 +397,15 @@ class Question(db.Model):
     question_type = db.Column(db.String(20), nullable=False)  # multiple_choice, fill_blank, drag_drop, ordering, short_answer, long_answer
     question_text = db.Column(db.Text, nullable=False)
     options = db.Column(db.JSON)  # For multiple choice, drag and drop, and ordering questions
-    correct_answer = db.Column(db.Text, nullable=False)
+    correct_answer = db.Column(db.JSON, nullable=False)  # String, or list for ordering and drag_drop
     points = db.Column(db.Integer, default=1)
     order = db.Column(db.Integer, default=0)  # For ordering questions
     topic = db.Column(db.String(200))
     subtopic = db.Column(db.String(200))
     explanation = db.Column(db.Text)
+    __table_args__ = (
+        db.Index('ix_question_assignment_id_order', 'assignment_id', 'order'),
+    )
 
 class Assignment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -111,13 +413,19 @@ class Assignment(db.Model):
     description = db.Column(db.Text)
     due_date = db.Column(db.DateTime, nullable=False)
     completed = db.Column(db.Boolean, default=False)
-    student_answer = db.Column(db.Text)
-    ai_feedback = db.Column(db.Text)
+    student_answer = db.Column(db.JSON)  # {"q<id>": answer}
+    ai_feedback = db.Column(db.JSON)  # [{"question_id", "is_correct", "feedback"}]
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     syllabus_id = db.Column(db.Integer, db.ForeignKey('syllabus.id'), nullable=False)
     questions = db.relationship('Question', backref='assignment', lazy=True, order_by='Question.order')
     total_points = db.Column(db.Integer, default=0)
     earned_points = db.Column(db.Integer, default=0)
+    version_id = db.Column(db.Integer, nullable=False, default=1)  # Bumped on every write; see lock_unchanged_row
+    __table_args__ = (
+        db.Index('ix_assignment_user_id_due_date', 'user_id', 'due_date'),
+        db.Index('ix_assignment_syllabus_id', 'syllabus_id'),
+    )
+    __mapper_args__ = {'version_id_col': version_id}
 
 class Todo(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -128,6 +436,10 @@ class Todo(db.Model):
     completed = db.Column(db.Boolean, default=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    __table_args__ = (
+        db.Index('ix_todo_user_id_priority_due_date', 'user_id', 'priority', 'due_date'),
+        db.Index('ix_todo_user_id_due_date', 'user_id', 'due_date'),
+    )
 
 class StudyPlan(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -135,13 +447,540 @@ class StudyPlan(db.Model):
     start_date = db.Column(db.DateTime, nullable=False)
     end_date = db.Column(db.DateTime, nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    content = db.Column(db.Text)  # JSON content of the study plan
+    content = db.Column(db.JSON)  # Structured content of the study plan
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    __table_args__ = (
+        db.Index('ix_study_plan_user_id_created_at', 'user_id', 'created_at'),
+    )
 
 @login_manager.user_loader
 def load_user(user_id):
     return db.session.get(User, int(user_id))
 
+# Query helpers
+# Pages load every relationship their template walks up front, so rendering
+# never falls back to a lazy SELECT per row.
+def get_syllabus_with_notes_or_404(syllabus_id):
+    return db.get_or_404(Syllabus, syllabus_id, options=[selectinload(Syllabus.notes)])
+
+def get_assignment_with_questions_or_404(assignment_id):
+    return db.get_or_404(Assignment, assignment_id, options=[selectinload(Assignment.questions)])
+
+def get_study_plan_inputs(user_id):
+    """Return (syllabi, topics, assignments, todos) for the study planner.
+
+    Each is a single projected query over the user's rows; ``topics`` maps a
+    syllabus id to {topic: [subtopic, ...]} in note order.
+    """
+    syllabi = db.session.execute(
+        select(Syllabus.id, Syllabus.title).where(Syllabus.user_id == user_id).order_by(Syllabus.id)
+    ).all()
+
+    topics = {}
+    note_rows = db.session.execute(
+        select(Note.syllabus_id, Note.topic, Note.subtopic)
+        .join(Syllabus, Note.syllabus_id == Syllabus.id)
+        .where(Syllabus.user_id == user_id)
+        .order_by(Note.syllabus_id, Note.id)
+    )
+    for syllabus_id, topic, subtopic in note_rows:
+        topics.setdefault(syllabus_id, {}).setdefault(topic, []).append(subtopic)
+
+    assignments = db.session.execute(
+        select(Assignment.id, Assignment.title, Assignment.due_date, Assignment.syllabus_id)
+        .where(Assignment.user_id == user_id)
+    ).all()
+    todos = db.session.execute(
+        select(Todo.id, Todo.title, Todo.priority, Todo.due_date)
+        .where(Todo.user_id == user_id, Todo.completed == False)  # noqa: E712
+    ).all()
+    return syllabi, topics, assignments, todos
+
+# Keyset pagination
+# Listings are ordered by a sort column plus id, and each page starts strictly
+# after the last row of the previous one. A page is then a single index range
+# scan, however long the user's history is. The cursor carries that last row's
+# sort values, base64-encoded.
+def encode_cursor(values):
+    payload = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, columns):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+        return [decode_cursor_value(column, value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError):
+        raise ValueError("Invalid page cursor")
+
+def decode_cursor_value(column, value):
+    # The cursor comes from the client: only let through values of the column's own type
+    if value is None:
+        if not column.nullable:
+            raise ValueError
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        if not isinstance(value, str):
+            raise ValueError
+        return datetime.fromisoformat(value)
+    if type(value) is not python_type:  # Exact match: rejects True for an integer id
+        raise ValueError
+    return value
+
+def keyset_page(statement, order_by, cursor=None, per_page=None):
+    """Return (rows, next_cursor) for one page of an ORM select.
+
+    ``order_by`` is a list of (column, descending) pairs whose last column is
+    unique. NULLs sort as the smallest value on every database. A malformed
+    cursor raises ValueError.
+    """
+    per_page = per_page or app.config['LIST_PAGE_SIZE']
+    columns = [column for column, _ in order_by]
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        clauses = []
+        for index, (column, descending) in enumerate(order_by):
+            ties = [
+                column_.is_(None) if value is None else column_ == value
+                for column_, value in zip(columns[:index], values)
+            ]
+            value = values[index]
+            if value is None:
+                after = false() if descending else column.isnot(None)
+            elif descending:
+                after = or_(column < value, column.is_(None))
+            else:
+                after = column > value
+            clauses.append(and_(*ties, after))
+        statement = statement.where(or_(*clauses))
+    statement = statement.order_by(*[
+        column.desc().nulls_last() if descending else column.asc().nulls_first()
+        for column, descending in order_by
+    ])
+    rows = db.session.scalars(statement.limit(per_page + 1)).all()
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor([getattr(rows[-1], column.key) for column in columns])
+    return rows, next_cursor
+
+def get_per_page():
+    try:
+        per_page = int(request.args.get('per_page', app.config['LIST_PAGE_SIZE']))
+    except ValueError:
+        per_page = app.config['LIST_PAGE_SIZE']
+    return max(1, min(per_page, app.config['LIST_MAX_PAGE_SIZE']))
+
+def wants_json():
+    return request.args.get('format') == 'json' or request.accept_mimetypes.best == 'application/json'
+
+def invalid_cursor_response(endpoint):
+    if wants_json():
+        return jsonify({"error": "Invalid page cursor"}), 400
+    flash('That page link is no longer valid; showing the first page.', 'error')
+    return redirect(url_for(endpoint))
+
+def isoformat_or_none(value):
+    return value.isoformat() if value else None
+
+# Optimistic concurrency
+# Routes that call the LLM read what they need, release the session before the
+# slow call, and then write in a short transaction. The write only goes
+# through if the row still has the version that was read.
+def lock_unchanged_row(model, row_id, version_id, *where, **values):
+    """Lock the row for the rest of the transaction if it is still at ``version_id``
+    and ``where`` holds; return False if it was rewritten or deleted in the meantime.
+
+    The check is the UPDATE itself, so a concurrent writer cannot slip in between
+    the check and the caller's own writes. ``values`` are written along with it;
+    without any the row is updated to itself just to take the lock. Adding child
+    rows (notes, assignments) leaves the parent's version alone, so such writes
+    never conflict.
+    """
+    result = db.session.execute(
+        update(model)
+        .where(model.id == row_id, model.version_id == version_id, *where)
+        .values(values or {'version_id': model.version_id})
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+# Background syllabus ingestion
+# The Syllabus row doubles as the persisted job record: its id is the job id and
+# its status column tracks progress (pending -> extracting -> summarizing -> ready/failed).
+SYLLABUS_ACTIVE_STATUSES = ('pending', 'extracting', 'summarizing')
+
+ingestion_executor = ThreadPoolExecutor(max_workers=app.config['INGESTION_WORKERS'], thread_name_prefix='ingestion')
+grading_executor = ThreadPoolExecutor(max_workers=app.config['GRADING_MAX_WORKERS'], thread_name_prefix='grading')
+ingestion_monitor_started = False
+ingestion_monitor_lock = threading.Lock()
+_ingestion_owner = (None, None)  # (pid, token)
+
+def extract_pdf_text(file_path):
+    # Extract text directly from PDF using PyPDF2, sharding large documents across processes
+    return pdf_extraction.extract_text(
+        file_path,
+        workers=app.config['PDF_EXTRACT_WORKERS'],
+        page_timeout=app.config['PDF_EXTRACT_PAGE_TIMEOUT'],
+        serial_max_pages=app.config['PDF_EXTRACT_SERIAL_MAX_PAGES']
+    )
+
+def get_syllabus_pdf_text(syllabus):
+    """Return the syllabus PDF text, extracting and storing it once for rows uploaded before it was persisted."""
+    if syllabus.extracted_text is None and syllabus.file_path and os.path.exists(syllabus.file_path):
+        syllabus.extracted_text = extract_pdf_text(syllabus.file_path)
+        db.session.commit()
+    return syllabus.extracted_text
+
+def receive_upload(file):
+    """Stream an uploaded file into a temporary file in the upload folder, hashing it on the way.
+
+    Returns (sha256 hex digest, temporary path). Identical uploads share one
+    file in the content-addressed store, which stays on disk while any Syllabus
+    row points at it; see publish_upload and delete_upload.
+    """
+    digest = hashlib.sha256()
+    fd, temp_path = tempfile.mkstemp(dir=app.config['UPLOAD_FOLDER'], suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            for chunk in iter(lambda: file.stream.read(app.config['UPLOAD_CHUNK_SIZE']), b''):
+                digest.update(chunk)
+                temp_file.write(chunk)
+    except BaseException:
+        discard_file(temp_path)
+        raise
+    return digest.hexdigest(), temp_path
+
+def upload_path(content_hash):
+    return os.path.join(app.config['UPLOAD_FOLDER'], f"{content_hash}.pdf")
+
+def publish_upload(temp_path, file_path):
+    """Move a received upload to its place in the store. Call only after the
+    Syllabus row that points at ``file_path`` is committed (see delete_upload)."""
+    try:
+        # Same content, same bytes: replacing an existing copy is harmless and atomic
+        os.replace(temp_path, file_path)
+    except BaseException:
+        discard_file(temp_path)
+        raise
+
+def discard_file(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+def find_processed_duplicate(syllabus):
+    """Return another syllabus with the same PDF that has already been processed."""
+    if not syllabus.content_hash:
+        return None
+    return Syllabus.query.filter(
+        Syllabus.content_hash == syllabus.content_hash,
+        Syllabus.id != syllabus.id,
+        Syllabus.status == 'ready',
+        Syllabus.extracted_text.isnot(None)
+    ).order_by(Syllabus.id).first()
+
+def set_syllabus_status(syllabus, status, error=None):
+    syllabus.status = status
+    syllabus.status_error = error
+    syllabus.status_updated_at = datetime.now(timezone.utc)
+    db.session.commit()
+
+def ingestion_owner():
+    """Token naming this process in Syllabus.job_owner.
+
+    The pid keeps forked workers apart; the random part keeps a restarted
+    process that happens to get the same pid from adopting its predecessor's jobs.
+    """
+    global _ingestion_owner
+    pid = os.getpid()
+    if _ingestion_owner[0] != pid:
+        _ingestion_owner = (pid, f"{pid}-{uuid.uuid4().hex[:16]}")
+    return _ingestion_owner[1]
+
+def ingestion_job_stale():
+    """SQL condition for an unfinished job whose owner has stopped heartbeating."""
+    stale_before = datetime.now(timezone.utc) - timedelta(seconds=app.config['INGESTION_STALE_AFTER'])
+    return and_(
+        Syllabus.status.in_(SYLLABUS_ACTIVE_STATUSES),
+        or_(Syllabus.job_heartbeat_at.is_(None), Syllabus.job_heartbeat_at < stale_before)
+    )
+
+def enqueue_syllabus_ingestion(syllabus_id):
+    ingestion_executor.submit(ingest_syllabus, syllabus_id)
+
+def requeue_syllabus_ingestion(syllabus_id, condition):
+    """Make this process the owner of a job and queue it again from the start, if ``condition`` still holds.
+
+    The condition is part of the UPDATE, so when several processes race for the
+    same job only one of them wins it. Returns whether the job was queued.
+    """
+    now = datetime.now(timezone.utc)
+    requeued = Syllabus.query.filter(Syllabus.id == syllabus_id, condition).update(
+        {'status': 'pending', 'status_error': None, 'status_updated_at': now,
+         'job_owner': ingestion_owner(), 'job_heartbeat_at': now, 'version_id': Syllabus.version_id + 1},
+        synchronize_session=False
+    )
+    db.session.commit()
+    if requeued:
+        enqueue_syllabus_ingestion(syllabus_id)
+    return bool(requeued)
+
+def ingest_syllabus(syllabus_id):
+    """Extract and summarize an uploaded syllabus PDF outside of the request cycle."""
+    with app.app_context():
+        # Claim the job atomically so a job queued twice only runs once, and only
+        # in the process that owns it
+        claimed = Syllabus.query.filter_by(id=syllabus_id, status='pending', job_owner=ingestion_owner()).update(
+            {'status': 'extracting', 'status_updated_at': datetime.now(timezone.utc), 'version_id': Syllabus.version_id + 1},
+            synchronize_session=False
+        )
+        db.session.commit()
+        if not claimed:
+            return
+        
+        syllabus = db.session.get(Syllabus, syllabus_id)
+        try:
+            # The same PDF has been processed before: reuse its text and summary
+            duplicate = find_processed_duplicate(syllabus)
+            if duplicate:
+                syllabus.extracted_text = duplicate.extracted_text
+                syllabus.content = duplicate.content
+                syllabus.content_html = duplicate.content_html
+                set_syllabus_status(syllabus, 'ready')
+                return
+            
+            # Store the raw text so generation calls never have to re-parse the PDF;
+            # a retried job keeps the text its failed run already extracted
+            pdf_text = syllabus.extracted_text or extract_pdf_text(syllabus.file_path)
+            syllabus.extracted_text = pdf_text
+            set_syllabus_status(syllabus, 'summarizing')
+            
+            # Use OpenAI to summarize and structure the extracted text
+            # Long syllabi are summarized per chunk and the summaries joined in order
+            syllabus.content = "\n\n".join(complete_chunked(
+                'syllabus_summary',
+                system_prompt="Extract the main content from this PDF syllabus. Focus on the course objectives, topics, and requirements.",
+                text=pdf_text
+            ))
+            syllabus.content_html = markdown_to_html(syllabus.content)
+            set_syllabus_status(syllabus, 'ready')
+        except StaleDataError:
+            # Another process took the job over (our heartbeat stalled); its run wins
+            db.session.rollback()
+            print(f"Syllabus {syllabus_id} was taken over by another worker; abandoning this run")
+        except Exception as e:
+            print(f"Error processing PDF for syllabus {syllabus_id}: {e}")
+            db.session.rollback()
+            syllabus.content = "Error extracting content from PDF"
+            syllabus.content_html = markdown_to_html(syllabus.content)
+            try:
+                set_syllabus_status(syllabus, 'failed', str(e))
+            except StaleDataError:
+                db.session.rollback()
+
+def heartbeat_ingestion_jobs():
+    """Mark every unfinished job owned by this process as still alive."""
+    Syllabus.query.filter(
+        Syllabus.job_owner == ingestion_owner(),
+        Syllabus.status.in_(SYLLABUS_ACTIVE_STATUSES)
+    ).update({'job_heartbeat_at': datetime.now(timezone.utc)}, synchronize_session=False)
+    db.session.commit()
+
+def requeue_stale_ingestion_jobs():
+    """Take over jobs whose owner stopped heartbeating (a restart or a crashed worker), whatever their age."""
+    for (syllabus_id,) in db.session.query(Syllabus.id).filter(ingestion_job_stale()).all():
+        requeue_syllabus_ingestion(syllabus_id, ingestion_job_stale())
+
+def monitor_ingestion():
+    """Keep this process's jobs alive and pick up orphaned ones, for as long as the process runs."""
+    while True:
+        with app.app_context():
+            try:
+                heartbeat_ingestion_jobs()
+                requeue_stale_ingestion_jobs()
+            except Exception as e:
+                db.session.rollback()
+                print(f"Error monitoring syllabus ingestion: {e}")
+        time.sleep(app.config['INGESTION_HEARTBEAT_INTERVAL'])
+
+@app.before_request
+def start_ingestion_monitor():
+    global ingestion_monitor_started
+    if ingestion_monitor_started:
+        return
+    with ingestion_monitor_lock:
+        if ingestion_monitor_started:
+            return
+        ingestion_monitor_started = True
+        threading.Thread(target=monitor_ingestion, name='ingestion-monitor', daemon=True).start()
+
+# Background cleanup of external resources
+# Deleting a syllabus only touches the database in the request; its uploaded
+# PDF and OpenAI file are removed afterwards by this queue, with retries.
+# The queue is in memory, so steps still pending at shutdown are dropped.
+cleanup_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='cleanup')
+
+def delete_openai_file(file_id):
+    try:
+        llm.delete_file(file_id)
+    except Exception as e:
+        if getattr(e, 'status_code', None) == 404:  # Already gone
+            return
+        raise
+
+def upload_in_use(file_path):
+    with app.app_context():
+        return db.session.query(Syllabus.id).filter_by(file_path=file_path).first() is not None
+
+def delete_upload(file_path):
+    # Files are named by content hash, so a new upload of the same PDF can claim
+    # the path at any time. Move the file aside before the final check: uploads
+    # commit their row before publishing the file, so a row the check misses
+    # was committed after the move, and its upload publishes a fresh copy.
+    if upload_in_use(file_path):
+        return
+    doomed_path = f"{file_path}.{os.getpid()}-{threading.get_ident()}.deleting"
+    try:
+        os.rename(file_path, doomed_path)
+    except FileNotFoundError:
+        return
+    if upload_in_use(file_path):
+        os.replace(doomed_path, file_path)
+    else:
+        os.remove(doomed_path)
+
+def run_cleanup(description, action, *args):
+    attempts = app.config['CLEANUP_MAX_ATTEMPTS']
+    for attempt in range(attempts):
+        try:
+            action(*args)
+            return
+        except Exception as e:
+            if attempt + 1 >= attempts:
+                print(f"Giving up on {description} after {attempts} attempts: {e}")
+                return
+            delay = app.config['CLEANUP_RETRY_DELAY'] * 2 ** attempt
+            print(f"Error during {description}: {e}; retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+def enqueue_cleanup(description, action, *args):
+    cleanup_executor.submit(run_cleanup, description, action, *args)
+
+# Per-user dashboard and calendar aggregates
+# Every write route that changes a user's todos, assignments or syllabi bumps
+# that user's data_version in the same transaction. Cached aggregates remember
+# the version they were built at and are rebuilt once it moves on. The version
+# lives in the database, so a write seen by one worker process invalidates the
+# aggregates cached by every other one.
+aggregate_cache = OrderedDict()  # (user_id, name) -> (generation, expires_at, value)
+aggregate_cache_lock = threading.Lock()
+
+def get_user_generation(user_id):
+    return db.session.scalar(select(User.data_version).where(User.id == user_id)) or 0
+
+def invalidate_user_aggregates(user_id):
+    """Bump the user's data_version. Call before committing the write it belongs to."""
+    db.session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(data_version=User.data_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+def cached_user_aggregate(user_id, name, build):
+    """Return ``build(user_id)``, cached until the user's next write or the TTL."""
+    key = (user_id, name)
+    now = time.monotonic()
+    # Read before building: a write that lands during the build moves the
+    # version past the one the value is stored under, so it is never served
+    generation = get_user_generation(user_id)
+    with aggregate_cache_lock:
+        entry = aggregate_cache.get(key)
+        if entry and entry[0] == generation and entry[1] > now:
+            aggregate_cache.move_to_end(key)
+            return entry[2]
+    
+    value = build(user_id)
+    with aggregate_cache_lock:
+        aggregate_cache[key] = (generation, now + app.config['AGGREGATE_CACHE_TTL'], value)
+        aggregate_cache.move_to_end(key)
+        while len(aggregate_cache) > app.config['AGGREGATE_CACHE_SIZE']:
+            aggregate_cache.popitem(last=False)
+    return value
+
+def build_dashboard_stats(user_id):
+    assignment_counts = db.session.execute(
+        select(
+            func.count(Assignment.id),
+            func.coalesce(func.sum(case((Assignment.completed == True, 1), else_=0)), 0),  # noqa: E712
+            func.coalesce(func.sum(case((Assignment.completed == False, 1), else_=0)), 0)  # noqa: E712
+        ).where(Assignment.user_id == user_id)
+    ).one()
+    recent_assignments = db.session.execute(
+        select(Assignment.id, Assignment.title, Assignment.due_date, Assignment.completed)
+        .where(Assignment.user_id == user_id)
+        .order_by(Assignment.due_date.desc())
+        .limit(5)
+    ).mappings().all()
+    return {
+        'syllabus_count': db.session.scalar(select(func.count(Syllabus.id)).where(Syllabus.user_id == user_id)),
+        'assignment_count': assignment_counts[0],
+        'completed_count': assignment_counts[1],
+        'pending_count': assignment_counts[2],
+        'recent_assignments': [dict(row) for row in recent_assignments],
+    }
+
+def build_calendar_events(user_id, start, end):
+    """Return (etag, JSON body) for the events due in [start, end)."""
+    events = []
+    
+    # Add todos
+    todos = db.session.execute(
+        select(Todo.id, Todo.title, Todo.description, Todo.due_date, Todo.completed, Todo.priority)
+        .where(Todo.user_id == user_id, Todo.due_date >= start, Todo.due_date < end)
+        .order_by(Todo.due_date)
+    )
+    for todo in todos:
+        events.append({
+            'id': f'todo-{todo.id}',
+            'title': todo.title,
+            'start': todo.due_date.isoformat(),
+            'end': todo.due_date.isoformat(),
+            'extendedProps': {
+                'type': 'todo',
+                'description': todo.description,
+                'completed': todo.completed,
+                'priority': todo.priority
+            }
+        })
+    
+    # Add assignments; an assignment counts as completed once it has been submitted
+    assignments = db.session.execute(
+        select(Assignment.id, Assignment.title, Assignment.description, Assignment.due_date,
+               Assignment.completed, Assignment.syllabus_id)
+        .where(Assignment.user_id == user_id, Assignment.due_date >= start, Assignment.due_date < end)
+        .order_by(Assignment.due_date)
+    )
+    for assignment in assignments:
+        events.append({
+            'id': f'assignment-{assignment.id}',
+            'title': assignment.title,
+            'start': assignment.due_date.isoformat(),
+            'end': assignment.due_date.isoformat(),
+            'extendedProps': {
+                'type': 'assignment',
+                'description': assignment.description,
+                'completed': bool(assignment.completed),
+                'syllabus_id': assignment.syllabus_id
+            }
+        })
+    
+    body = json.dumps(events)
+    # Derived from the content, so every worker process agrees on it
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()[:32], body
+
 # Routes
 @app.route('/')
 def index():
@@ -201,51 +1040,96 @@ def logout():
 @app.route('/dashboard')
 @login_required
 def dashboard():
-    # Get todos and assignments for the current user
-    user_assignments = Assignment.query.filter_by(user_id=current_user.id).all()
-    user_todos = Todo.query.filter_by(user_id=current_user.id).all()
-    
-    # Sort assignments for recent activity display
-    recent_assignments = sorted(
-        user_assignments, 
-        key=lambda x: x.due_date if x.due_date else datetime.min, 
-        reverse=True
-    )[:5]
-    
-    return render_template(
-        'dashboard.html', 
-        assignments=user_assignments, 
-        recent_assignments=recent_assignments,
-        todos=user_todos
-    )
+    stats = cached_user_aggregate(current_user.id, 'dashboard', build_dashboard_stats)
+    return render_template('dashboard.html', stats=stats, recent_assignments=stats['recent_assignments'])
 
 @app.route('/chat')
 @login_required
 def chat_page():
     return render_template('chat.html')
 
+def sse_event(data, event=None):
+    # Format a server-sent event frame
+    frame = f"event: {event}\n" if event else ""
+    return frame + f"data: {json.dumps(data)}\n\n"
+
+def stream_chat_events(messages):
+    use_cache = llm_cache_enabled('chat')
+    key = LLMCache.make_key("o4-mini", messages)
+    try:
+        cached = llm_cache.get(key) if use_cache else None
+        if cached is not None:
+            yield sse_event({"token": cached})
+            yield sse_event({}, event="done")
+            return
+        
+        stream = llm.chat_completion(
+            'chat',
+            model="o4-mini",
+            messages=messages,
+            stream=True
+        )
+        tokens = []
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                tokens.append(chunk.choices[0].delta.content)
+                yield sse_event({"token": chunk.choices[0].delta.content})
+        if use_cache and tokens:
+            llm_cache.set(key, "".join(tokens))
+        yield sse_event({}, event="done")
+    except Exception as e:
+        print(f"Error streaming chat response: {e}")
+        yield sse_event({"error": str(e)}, event="error")
+
 @app.route('/chat', methods=['POST'])
 @login_required
 def chat():
     message = request.json.get('message')
+    messages = [
+        {"role": "system", "content": "You are a helpful educational assistant. Provide clear, concise explanations."},
+        {"role": "user", "content": message}
+    ]
     
-    try:
-        response = client.chat.completions.create(
-            model="o4-mini",
-            messages=[
-                {"role": "system", "content": "You are a helpful educational assistant. Provide clear, concise explanations."},
-                {"role": "user", "content": message}
-            ]
+    # Stream tokens as server-sent events when asked; API clients keep the JSON response
+    if request.json.get('stream') or request.accept_mimetypes.best == 'text/event-stream':
+        return Response(
+            stream_with_context(stream_chat_events(messages)),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
         )
-        return jsonify({"response": response.choices[0].message.content})
+    
+    try:
+        content = complete_chat('chat', model="o4-mini", messages=messages)
+        return jsonify({"response": content})
+    except LLMUnavailableError as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/syllabi')
 @login_required
 def syllabi():
-    user_syllabi = Syllabus.query.filter_by(user_id=current_user.id).all()
-    return render_template('syllabi.html', syllabi=user_syllabi)
+    try:
+        user_syllabi, next_cursor = keyset_page(
+            select(Syllabus).where(Syllabus.user_id == current_user.id),
+            [(Syllabus.created_at, True), (Syllabus.id, True)],
+            request.args.get('cursor'), get_per_page()
+        )
+    except ValueError:
+        return invalid_cursor_response('syllabi')
+    
+    if wants_json():
+        return jsonify({
+            "items": [{
+                "id": syllabus.id,
+                "title": syllabus.title,
+                "status": syllabus.status,
+                "has_file": bool(syllabus.file_path),
+                "created_at": isoformat_or_none(syllabus.created_at)
+            } for syllabus in user_syllabi],
+            "next_cursor": next_cursor
+        })
+    return render_template('syllabi.html', syllabi=user_syllabi, next_cursor=next_cursor)
 
 @app.route('/syllabi', methods=['POST'])
 @login_required
@@ -254,38 +1138,46 @@ def create_syllabus():
         file = request.files['file']
         if file and allowed_file(file.filename):
             filename = secure_filename(file.filename)
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{current_user.id}_{filename}")
-            file.save(file_path)
-            
-            # Extract text directly from PDF using PyPDF2
-            try:
-                pdf_text = ""
-                with open(file_path, 'rb') as pdf_file:
-                    pdf_reader = PyPDF2.PdfReader(pdf_file)
-                    for page_num in range(len(pdf_reader.pages)):
-                        page = pdf_reader.pages[page_num]
-                        pdf_text += page.extract_text() + "\n\n"
-                
-                # Use OpenAI to summarize and structure the extracted text
-                response = client.chat.completions.create(
-                    model="o4-mini",
-                    messages=[
-                        {"role": "system", "content": "Extract the main content from this PDF syllabus. Focus on the course objectives, topics, and requirements."},
-                        {"role": "user", "content": pdf_text}
-                    ]
-                )
-                content = response.choices[0].message.content
-            except Exception as e:
-                content = "Error extracting content from PDF"
-                flash(f'Error processing PDF: {str(e)}', 'error')
+            content_hash, temp_path = receive_upload(file)
+            file_path = upload_path(content_hash)
             
+            # Extraction and summarization run as a background job; the client polls for progress
             syllabus = Syllabus(
                 title=request.form.get('title', filename),
-                content=content,
                 file_path=file_path,
+                content_hash=content_hash,
                 user_id=current_user.id,
+                status='pending',
+                status_updated_at=datetime.now(timezone.utc),
+                job_owner=ingestion_owner(),
+                job_heartbeat_at=datetime.now(timezone.utc),
                 created_at=datetime.now(timezone.utc)
             )
+            try:
+                db.session.add(syllabus)
+                invalidate_user_aggregates(current_user.id)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                discard_file(temp_path)
+                raise
+            
+            # Only now that the row is committed may the file take its shared name
+            try:
+                publish_upload(temp_path, file_path)
+            except OSError as e:
+                print(f"Error storing upload for syllabus {syllabus.id}: {e}")
+                set_syllabus_status(syllabus, 'failed', 'The uploaded file could not be stored')
+                return jsonify({"error": "Error storing the uploaded file"}), 500
+            
+            enqueue_syllabus_ingestion(syllabus.id)
+            
+            return jsonify({
+                "message": "Syllabus uploaded, processing started",
+                "job_id": syllabus.id,
+                "status": syllabus.status,
+                "status_url": url_for('syllabus_status', id=syllabus.id)
+            }), 202
         else:
             flash('Invalid file type. Only PDF files are allowed.', 'error')
             return redirect(url_for('syllabi'))
@@ -295,19 +1187,56 @@ def create_syllabus():
         syllabus = Syllabus(
             title=data['title'],
             content=data['content'],
+            content_html=markdown_to_html(data['content']),
             user_id=current_user.id,
             created_at=datetime.now(timezone.utc)
         )
     
     db.session.add(syllabus)
+    invalidate_user_aggregates(current_user.id)
     db.session.commit()
     
     return jsonify({"message": "Syllabus created successfully"})
 
+@app.route('/syllabi/<int:id>/status')
+@login_required
+def syllabus_status(id):
+    syllabus = Syllabus.query.get_or_404(id)
+    if syllabus.user_id != current_user.id:
+        return jsonify({"error": "Unauthorized"}), 403
+    
+    response = jsonify({
+        "job_id": syllabus.id,
+        "status": syllabus.status,
+        "error": syllabus.status_error,
+        "updated_at": syllabus.status_updated_at.isoformat() if syllabus.status_updated_at else None
+    })
+    response.cache_control.no_store = True  # Polled until the job finishes; never reuse a stale status
+    return response
+
+@app.route('/syllabi/<int:id>/retry', methods=['POST'])
+@login_required
+def retry_syllabus(id):
+    syllabus = Syllabus.query.get_or_404(id)
+    if syllabus.user_id != current_user.id:
+        return jsonify({"error": "Unauthorized"}), 403
+    
+    # A failed job, or one whose worker died, can be re-queued; the condition
+    # makes a double click a no-op and keeps a live job from running twice
+    if not requeue_syllabus_ingestion(id, or_(Syllabus.status == 'failed', ingestion_job_stale())):
+        return jsonify({"error": "Only failed or stalled syllabi can be retried", "status": syllabus.status}), 409
+    
+    return jsonify({
+        "message": "Syllabus processing restarted",
+        "job_id": id,
+        "status": 'pending',
+        "status_url": url_for('syllabus_status', id=id)
+    }), 202
+
 @app.route('/syllabi/<int:id>')
 @login_required
 def view_syllabus(id):
-    syllabus = Syllabus.query.get_or_404(id)
+    syllabus = get_syllabus_with_notes_or_404(id)
     
     if syllabus.user_id != current_user.id:
         flash('Unauthorized access', 'error')
@@ -323,11 +1252,39 @@ def download_syllabus(id):
         flash('Unauthorized access', 'error')
         return redirect(url_for('syllabi'))
     
-    if syllabus.file_path and os.path.exists(syllabus.file_path):
-        return send_file(syllabus.file_path, as_attachment=True)
-    else:
+    if not (syllabus.file_path and os.path.exists(syllabus.file_path)):
         flash('File not found', 'error')
         return redirect(url_for('view_syllabus', id=id))
+    
+    # Stored files are named by hash; download under the syllabus title instead
+    download_name = secure_filename(syllabus.title) or 'syllabus'
+    if not download_name.lower().endswith('.pdf'):
+        download_name += '.pdf'
+    
+    offload = app.config['DOWNLOAD_OFFLOAD']
+    if offload == 'x-accel':
+        # nginx streams the file itself (with Range and conditional GET support)
+        # from an internal location; the worker only does the ownership check
+        relative_path = os.path.relpath(syllabus.file_path, app.config['UPLOAD_FOLDER']).replace(os.sep, '/')
+        response = Response(mimetype='application/pdf')
+        response.headers['X-Accel-Redirect'] = app.config['X_ACCEL_PREFIX'].rstrip('/') + '/' + relative_path
+        response.headers['Content-Disposition'] = f'attachment; filename="{download_name}"'
+        response.cache_control.private = True
+        return response
+    
+    # send_file answers Range and If-None-Match/If-Modified-Since requests; with
+    # USE_X_SENDFILE it emits an X-Sendfile header instead of streaming the body
+    response = send_file(
+        os.path.abspath(syllabus.file_path),
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name=download_name,
+        conditional=True,
+        etag=syllabus.content_hash or True
+    )
+    response.accept_ranges = 'bytes'  # Advertise resumable downloads on full responses too
+    response.cache_control.private = True
+    return response
 
 @app.route('/syllabi/<int:id>/delete', methods=['DELETE'])
 @login_required
@@ -337,35 +1294,24 @@ def delete_syllabus(id):
     if syllabus.user_id != current_user.id:
         return jsonify({"error": "Unauthorized"}), 403
     
-    # Delete associated notes
-    Note.query.filter_by(syllabus_id=syllabus.id).delete()
-    
-    # Delete associated assignments
-    for assignment in Assignment.query.filter_by(syllabus_id=syllabus.id).all():
-        # Delete questions for each assignment
-        Question.query.filter_by(assignment_id=assignment.id).delete()
-        db.session.delete(assignment)
-    
-    # Delete the OpenAI file if it exists
-    if syllabus.openai_file_id:
-        try:
-            client.files.delete(file_id=syllabus.openai_file_id)
-        except Exception as e:
-            # Log the error but continue with database deletion
-            print(f"Error deleting OpenAI file {syllabus.openai_file_id}: {e}")
-    
-    # Delete the physical file if it exists
-    if syllabus.file_path and os.path.exists(syllabus.file_path):
-        try:
-            os.remove(syllabus.file_path)
-        except Exception as e:
-            # Log the error but continue with database deletion
-            print(f"Error deleting file {syllabus.file_path}: {e}")
+    openai_file_id = syllabus.openai_file_id
+    file_path = syllabus.file_path
     
-    # Delete the syllabus from the database
-    db.session.delete(syllabus)
+    # Delete the syllabus with its notes, assignments and their questions in one transaction
+    assignment_ids = select(Assignment.id).where(Assignment.syllabus_id == syllabus.id)
+    db.session.execute(delete(Question).where(Question.assignment_id.in_(assignment_ids)))
+    db.session.execute(delete(Assignment).where(Assignment.syllabus_id == syllabus.id))
+    db.session.execute(delete(Note).where(Note.syllabus_id == syllabus.id))
+    db.session.execute(delete(Syllabus).where(Syllabus.id == syllabus.id))
+    invalidate_user_aggregates(current_user.id)
     db.session.commit()
     
+    # Remove the OpenAI file and the uploaded PDF in the background
+    if openai_file_id:
+        enqueue_cleanup(f"deleting OpenAI file {openai_file_id}", delete_openai_file, openai_file_id)
+    if file_path:
+        enqueue_cleanup(f"deleting file {file_path}", delete_upload, file_path)
+    
     return jsonify({"message": "Syllabus deleted successfully"})
 
 @app.route('/generate_notes', methods=['POST'])
@@ -377,30 +1323,34 @@ def generate_notes():
     if syllabus.user_id != current_user.id:
         return jsonify({"error": "Unauthorized"}), 403
     
+    if syllabus.status in SYLLABUS_ACTIVE_STATUSES:
+        return jsonify({"error": "Syllabus is still being processed", "status": syllabus.status}), 409
+    if syllabus.status == 'failed':
+        return jsonify({"error": "Syllabus processing failed. Retry it from the syllabi page.", "status": syllabus.status}), 409
+    
     try:
         # Get syllabus content - from PDF if available
         syllabus_content = syllabus.content
         
-        # If there's a PDF file, extract text directly to supplement the content
-        if syllabus.file_path and os.path.exists(syllabus.file_path):
-            try:
-                pdf_text = ""
-                with open(syllabus.file_path, 'rb') as pdf_file:
-                    pdf_reader = PyPDF2.PdfReader(pdf_file)
-                    for page_num in range(len(pdf_reader.pages)):
-                        page = pdf_reader.pages[page_num]
-                        pdf_text += page.extract_text() + "\n\n"
-                
+        # If there's a PDF file, use the text extracted at upload time to supplement the content
+        try:
+            pdf_text = get_syllabus_pdf_text(syllabus)
+            if pdf_text:
                 # Combine existing content with PDF text
                 syllabus_content = syllabus_content + "\n\nAdditional content from PDF:\n" + pdf_text
-            except Exception as e:
-                print(f"Error extracting text from PDF: {e}")
+        except Exception as e:
+            print(f"Error extracting text from PDF: {e}")
+        
+        # Release the connection for the duration of the LLM calls
+        syllabus_version = syllabus.version_id
+        notes_version = syllabus.notes_version
+        db.session.close()
         
         # Generate structured notes with topics and subtopics
-        response = client.chat.completions.create(
-            model="o4-mini",
-            messages=[
-                {"role": "system", "content": """You are an expert educational content generator. Your task is to create comprehensive study notes.
+        # Long syllabi are split into chunks that are generated concurrently and then merged
+        responses = complete_chunked(
+            'notes',
+            system_prompt="""You are an expert educational content generator. Your task is to create comprehensive study notes.
                 
                 IMPORTANT: Your response MUST be valid JSON with this exact structure:
                 {
@@ -432,31 +1382,24 @@ def generate_notes():
                 8. Add a brief summary at the end of each subtopic
                 
                 IMPORTANT: Your entire response must be ONLY valid JSON that can be parsed with json.loads(). 
-                Do not include any explanations, markdown formatting outside of content fields, or other text."""},
-                {"role": "user", "content": syllabus_content}
-            ],
+                Do not include any explanations, markdown formatting outside of content fields, or other text.""",
+            text=syllabus_content,
             response_format={"type": "json_object"}
         )
         
-        # Get the content from the response
-        content = response.choices[0].message.content
-        print("Notes API Response:", content[:100] + "..." if len(content) > 100 else content)
+        for content in responses:
+            print("Notes API Response:", content[:100] + "..." if len(content) > 100 else content)
         
-        try:
-            # Try to parse the JSON
-            notes_data = json.loads(content)
-        except json.JSONDecodeError as json_err:
-            print(f"JSON parsing error: {json_err}")
+        notes_data = merge_topic_responses(responses)
+        if notes_data is None:
             # Return an error response if JSON parsing fails
             return jsonify({"error": "Failed to generate structured notes. Please try again."}), 500
         
-        # Create notes for each topic and subtopic
-        note_order = 0
+        # Create notes for each topic and subtopic in a single executemany INSERT
+        note_rows = []
         for topic in notes_data['topics']:
             for subtopic in topic['subtopics']:
-                note = Note(
-                    title=f"{topic['title']}: {subtopic['title']}",
-                    content=f"""# {subtopic['title']}
+                content = f"""# {subtopic['title']}
 
 {subtopic['content']}
 
@@ -467,21 +1410,33 @@ def generate_notes():
 {chr(10).join(f"- {example}" for example in subtopic['examples'])}
 
 ## Summary
-{subtopic['summary']}""",
+{subtopic['summary']}"""
+                note_rows.append(dict(
+                    title=f"{topic['title']}: {subtopic['title']}",
+                    content=content,
+                    content_html=markdown_to_html(content),
                     syllabus_id=syllabus_id,
                     topic=topic['title'],
                     subtopic=subtopic['title'],
-                    order=note_order
-                )
-                db.session.add(note)
-                note_order += 1
+                    order=len(note_rows)
+                ))
         
+        # Two notes requests for one syllabus would otherwise both append a full set:
+        # only the first to bump notes_version may insert
+        if not lock_unchanged_row(Syllabus, syllabus_id, syllabus_version,
+                                  Syllabus.notes_version == notes_version, notes_version=notes_version + 1):
+            db.session.rollback()
+            return jsonify({"error": "The syllabus or its notes changed while notes were being generated. Please try again."}), 409
+        if note_rows:
+            db.session.execute(insert(Note), note_rows)
         db.session.commit()
         
         return jsonify({
             "message": "Notes generated successfully",
             "structure": notes_data
         })
+    except LLMUnavailableError as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         print(f"Error generating notes: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -495,30 +1450,34 @@ def generate_assignment():
     if syllabus.user_id != current_user.id:
         return jsonify({"error": "Unauthorized"}), 403
     
+    if syllabus.status in SYLLABUS_ACTIVE_STATUSES:
+        return jsonify({"error": "Syllabus is still being processed", "status": syllabus.status}), 409
+    if syllabus.status == 'failed':
+        return jsonify({"error": "Syllabus processing failed. Retry it from the syllabi page.", "status": syllabus.status}), 409
+    
     try:
         # Get syllabus content - from PDF if available
         syllabus_content = syllabus.content
         
-        # If there's a PDF file, extract text directly to supplement the content
-        if syllabus.file_path and os.path.exists(syllabus.file_path):
-            try:
-                pdf_text = ""
-                with open(syllabus.file_path, 'rb') as pdf_file:
-                    pdf_reader = PyPDF2.PdfReader(pdf_file)
-                    for page_num in range(len(pdf_reader.pages)):
-                        page = pdf_reader.pages[page_num]
-                        pdf_text += page.extract_text() + "\n\n"
-                
+        # If there's a PDF file, use the text extracted at upload time to supplement the content
+        try:
+            pdf_text = get_syllabus_pdf_text(syllabus)
+            if pdf_text:
                 # Combine existing content with PDF text
                 syllabus_content = syllabus_content + "\n\nAdditional content from PDF:\n" + pdf_text
-            except Exception as e:
-                print(f"Error extracting text from PDF: {e}")
+        except Exception as e:
+            print(f"Error extracting text from PDF: {e}")
+        
+        # Release the connection for the duration of the LLM calls
+        user_id = current_user.id
+        syllabus_version = syllabus.version_id
+        db.session.close()
         
         # Generate structured assignment with topics and subtopics
-        response = client.chat.completions.create(
-            model="o4-mini",
-            messages=[
-                {"role": "system", "content": """You are an expert educational content generator. Your task is to create a comprehensive assignment.
+        # Long syllabi are split into chunks that are generated concurrently and then merged
+        responses = complete_chunked(
+            'assignment',
+            system_prompt="""You are an expert educational content generator. Your task is to create a comprehensive assignment.
                 
                 IMPORTANT: Your response MUST be valid JSON with this exact structure:
                 {
@@ -594,55 +1553,55 @@ def generate_assignment():
                 8. Make questions engaging and relevant to the syllabus content
                 
                 IMPORTANT: Your entire response must be ONLY valid JSON that can be parsed with json.loads(). 
-                Do not include any explanations, markdown formatting, or other text."""},
-                {"role": "user", "content": syllabus_content}
-            ],
+                Do not include any explanations, markdown formatting, or other text.""",
+            text=syllabus_content,
             response_format={"type": "json_object"}
         )
         
-        # Get the content from the response
-        content = response.choices[0].message.content
-        print("Assignment API Response:", content[:100] + "..." if len(content) > 100 else content)
+        for content in responses:
+            print("Assignment API Response:", content[:100] + "..." if len(content) > 100 else content)
         
-        try:
-            # Try to parse the JSON
-            assignment_data = json.loads(content)
-        except json.JSONDecodeError as json_err:
-            print(f"JSON parsing error: {json_err}")
+        assignment_data = merge_topic_responses(responses)
+        if assignment_data is None:
             # Return an error response if JSON parsing fails
             return jsonify({"error": "Failed to generate structured assignment. Please try again."}), 500
         
+        if not lock_unchanged_row(Syllabus, syllabus_id, syllabus_version):
+            db.session.rollback()
+            return jsonify({"error": "The syllabus changed while the assignment was being generated. Please try again."}), 409
+        
         assignment = Assignment(
             title=assignment_data['title'],
             description=assignment_data['description'],
             due_date=datetime.now(timezone.utc) + timedelta(days=7),
-            user_id=current_user.id,
+            user_id=user_id,
             syllabus_id=syllabus_id
         )
         
         db.session.add(assignment)
         db.session.flush()  # Get the assignment ID
         
-        # Add questions with their topics and subtopics
-        question_order = 0
+        # Add questions with their topics and subtopics in a single executemany INSERT
+        question_rows = []
         for topic in assignment_data['topics']:
             for subtopic in topic['subtopics']:
                 for q_data in subtopic['questions']:
-                    question = Question(
+                    question_rows.append(dict(
                         assignment_id=assignment.id,
                         question_type=q_data['type'],
                         question_text=q_data['text'],
                         options=q_data.get('options'),
-                        correct_answer=json.dumps(q_data['correct_answer']) if isinstance(q_data['correct_answer'], list) else q_data['correct_answer'],
+                        correct_answer=q_data['correct_answer'],
                         points=q_data.get('points', 1),
-                        order=question_order,
+                        order=len(question_rows),
                         topic=topic['title'],
                         subtopic=subtopic['title'],
                         explanation=q_data.get('explanation', '')
-                    )
-                    db.session.add(question)
-                    question_order += 1
+                    ))
         
+        if question_rows:
+            db.session.execute(insert(Question), question_rows)
+        invalidate_user_aggregates(user_id)
         db.session.commit()
         
         return jsonify({
@@ -650,6 +1609,8 @@ def generate_assignment():
             "id": assignment.id,
             "structure": assignment_data
         })
+    except LLMUnavailableError as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         print(f"Error generating assignment: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -657,14 +1618,54 @@ def generate_assignment():
 @app.route('/assignments')
 @login_required
 def assignments():
-    user_assignments = Assignment.query.filter_by(user_id=current_user.id).all()
+    # Pending and completed assignments are listed, and paged, separately
+    per_page = get_per_page()
+    try:
+        pending_assignments, pending_cursor = keyset_page(
+            select(Assignment).where(Assignment.user_id == current_user.id, Assignment.completed == False),  # noqa: E712
+            [(Assignment.due_date, False), (Assignment.id, False)],
+            request.args.get('pending_cursor'), per_page
+        )
+        completed_assignments, completed_cursor = keyset_page(
+            select(Assignment).where(Assignment.user_id == current_user.id, Assignment.completed == True),  # noqa: E712
+            [(Assignment.due_date, True), (Assignment.id, True)],
+            request.args.get('completed_cursor'), per_page
+        )
+    except ValueError:
+        return invalid_cursor_response('assignments')
+    
+    if wants_json():
+        def serialize(assignment):
+            return {
+                "id": assignment.id,
+                "title": assignment.title,
+                "description": assignment.description,
+                "due_date": isoformat_or_none(assignment.due_date),
+                "completed": assignment.completed,
+                "total_points": assignment.total_points,
+                "earned_points": assignment.earned_points
+            }
+        return jsonify({
+            "pending": {"items": [serialize(a) for a in pending_assignments], "next_cursor": pending_cursor},
+            "completed": {"items": [serialize(a) for a in completed_assignments], "next_cursor": completed_cursor}
+        })
+    
+    stats = cached_user_aggregate(current_user.id, 'dashboard', build_dashboard_stats)
     now = datetime.now(timezone.utc)
-    return render_template('assignments.html', assignments=user_assignments, now=now)
+    return render_template(
+        'assignments.html',
+        pending_assignments=pending_assignments,
+        pending_cursor=pending_cursor,
+        completed_assignments=completed_assignments,
+        completed_cursor=completed_cursor,
+        stats=stats,
+        now=now
+    )
 
 @app.route('/assignments/<int:id>')
 @login_required
 def view_assignment(id):
-    assignment = Assignment.query.get_or_404(id)
+    assignment = get_assignment_with_questions_or_404(id)
     if assignment.user_id != current_user.id:
         flash('Unauthorized access', 'error')
         return redirect(url_for('assignments'))
@@ -672,6 +1673,43 @@ def view_assignment(id):
     edit_mode = request.args.get('edit', '0') == '1'
     return render_template('view_assignment.html', assignment=assignment, edit_mode=edit_mode)
 
+def grade_written_answer(question_type, question_text, correct_answer, answer):
+    """Use AI to evaluate a short/long answer. Returns (is_correct, feedback) and never raises."""
+    try:
+        content = complete_chat(
+            'grading',
+            model="o4-mini",
+            messages=[
+                {"role": "system", "content": f"""You are evaluating a {question_type} answer. 
+                Evaluate how well the student answer matches the expected answer.
+                
+                IMPORTANT: You must respond with ONLY a valid JSON object in the following format:
+                {{
+                  "score": 0.85, // A number between 0 and 1 representing how correct the answer is
+                  "feedback": "Your feedback to the student here"
+                }}
+                
+                Do not include any text before or after the JSON object.
+                The entire response must be a valid JSON object."""},
+                {"role": "user", "content": f"Question: {question_text}\nCorrect Answer: {correct_answer}\nStudent Answer: {answer}"}
+            ],
+            response_format={"type": "json_object"}
+        )
+        
+        try:
+            evaluation = json.loads(content)
+            score = evaluation.get('score', 0)
+            is_correct = score >= 0.7
+            question_feedback = evaluation.get('feedback', "")
+            print(f"Essay: Score={score}, Is Correct={is_correct}, Feedback={question_feedback[:30]}...")
+            return is_correct, question_feedback
+        except json.JSONDecodeError as json_err:
+            print(f"JSON decode error: {json_err} - Response content: {content}")
+            return False, "Error evaluating answer. Please try again."
+    except Exception as e:
+        print(f"Error evaluating answer: {str(e)}")
+        return False, "Error evaluating answer. Please try again."
+
 @app.route('/assignments/<int:id>/submit', methods=['POST'])
 @login_required
 def submit_assignment(id):
@@ -683,23 +1721,64 @@ def submit_assignment(id):
     total_points = 0
     earned_points = 0
     feedback = []
+    ai_grades = []  # (feedback index, question, future) for answers graded by the AI
+    
+    def record_grade(index, question, is_correct, question_feedback):
+        nonlocal earned_points
+        # Ensure is_correct is a boolean, not a string or other value
+        is_correct_bool = bool(is_correct)
+        if is_correct_bool:
+            earned_points += question.points
+        feedback[index]['is_correct'] = is_correct_bool
+        feedback[index]['feedback'] = question_feedback
+        print(f"Question {question.id}: is_correct={is_correct_bool}, points={question.points if is_correct_bool else 0}")
+    
+    # Load every answered question in one query; ids that don't belong to this assignment are ignored
+    question_ids = {}
+    for question_id_str in answers:
+        try:
+            question_ids[question_id_str] = int(question_id_str.replace('q', ''))
+        except ValueError:
+            continue
+    questions = {
+        question.id: question
+        for question in Question.query.filter(
+            Question.assignment_id == assignment.id,
+            Question.id.in_(question_ids.values())
+        )
+    }
+    
+    # Grading can take several LLM round trips; don't hold a connection meanwhile
+    assignment_id = assignment.id
+    assignment_version = assignment.version_id
+    db.session.close()
     
     for question_id_str, answer in answers.items():
-        question_id = int(question_id_str.replace('q', ''))
-        question = Question.query.get(question_id)
+        question = questions.get(question_ids.get(question_id_str))
         if not question:
             continue
-            
+        
+        total_points += question.points
+        index = len(feedback)
+        feedback.append({
+            'question_id': question_id_str,
+            'is_correct': False,
+            'feedback': ""
+        })
+        
         is_correct = False
         question_feedback = ""
         
-        # Get the correct answer, converting from JSON string if needed
         correct_answer = question.correct_answer
-        if question.question_type in ['ordering', 'drag_drop']:
-            try:
-                correct_answer = json.loads(correct_answer)
-            except (json.JSONDecodeError, TypeError):
-                pass  # Keep as string if not valid JSON
+        
+        if question.question_type in ['short_answer', 'long_answer']:
+            # Fan the AI evaluation out to the grading pool; the remaining answers
+            # are scored locally while these calls are in flight
+            future = grading_executor.submit(
+                grade_written_answer, question.question_type, question.question_text, correct_answer, answer
+            )
+            ai_grades.append((index, question, future))
+            continue
         
         if question.question_type == 'multiple_choice':
             # Simple string comparison
@@ -714,7 +1793,7 @@ def submit_assignment(id):
                 student_answer = json.loads(answer) if isinstance(answer, str) else answer
                 is_correct = student_answer == correct_answer
                 # Store the parsed answer back into the answers dictionary
-                answers[question_id_str] = json.dumps(student_answer)
+                answers[question_id_str] = student_answer
                 print(f"Ordering: Answer: {student_answer}, Correct: {correct_answer}, Match: {is_correct}")
             except (json.JSONDecodeError, TypeError) as e:
                 print(f"Ordering parsing error: {e}")
@@ -725,70 +1804,40 @@ def submit_assignment(id):
                 student_answer = json.loads(answer) if isinstance(answer, str) else answer
                 is_correct = student_answer == correct_answer
                 # Store the parsed answer back into the answers dictionary
-                answers[question_id_str] = json.dumps(student_answer)
+                answers[question_id_str] = student_answer
                 print(f"Drag drop: Answer: {student_answer}, Correct: {correct_answer}, Match: {is_correct}")
             except (json.JSONDecodeError, TypeError) as e:
                 print(f"Drag drop parsing error: {e}")
                 is_correct = False
-        elif question.question_type in ['short_answer', 'long_answer']:
-            # Use AI to evaluate the answer
-            try:
-                response = client.chat.completions.create(
-                    model="o4-mini",
-                    messages=[
-                        {"role": "system", "content": f"""You are evaluating a {question.question_type} answer. 
-                        Evaluate how well the student answer matches the expected answer.
-                        
-                        IMPORTANT: You must respond with ONLY a valid JSON object in the following format:
-                        {{
-                          "score": 0.85, // A number between 0 and 1 representing how correct the answer is
-                          "feedback": "Your feedback to the student here"
-                        }}
-                        
-                        Do not include any text before or after the JSON object.
-                        The entire response must be a valid JSON object."""},
-                        {"role": "user", "content": f"Question: {question.question_text}\nCorrect Answer: {correct_answer}\nStudent Answer: {answer}"}
-                    ],
-                    response_format={"type": "json_object"}
-                )
-                
-                content = response.choices[0].message.content
-                try:
-                    evaluation = json.loads(content)
-                    score = evaluation.get('score', 0)
-                    is_correct = score >= 0.7
-                    question_feedback = evaluation.get('feedback', "")
-                    print(f"Essay: Score={score}, Is Correct={is_correct}, Feedback={question_feedback[:30]}...")
-                except json.JSONDecodeError as json_err:
-                    print(f"JSON decode error: {json_err} - Response content: {content}")
-                    is_correct = False
-                    question_feedback = "Error evaluating answer. Please try again."
-            except Exception as e:
-                print(f"Error evaluating answer: {str(e)}")
-                question_feedback = "Error evaluating answer. Please try again."
-                is_correct = False
-        
-        if is_correct:
-            earned_points += question.points
-        total_points += question.points
-        
-        # Ensure is_correct is a boolean, not a string or other value
-        is_correct_bool = bool(is_correct)
-        
-        feedback.append({
-            'question_id': question_id_str,
-            'is_correct': is_correct_bool,
-            'feedback': question_feedback
-        })
         
-        print(f"Question {question_id}: is_correct={is_correct_bool}, points={question.points if is_correct_bool else 0}")
+        record_grade(index, question, is_correct, question_feedback)
     
-    assignment.student_answer = json.dumps(answers)
-    assignment.ai_feedback = json.dumps(feedback)
-    assignment.completed = True
-    assignment.total_points = total_points
-    assignment.earned_points = earned_points
+    # Collect the AI grades; a failure only affects its own question
+    for index, question, future in ai_grades:
+        try:
+            is_correct, question_feedback = future.result(timeout=app.config['GRADING_TIMEOUT'])
+        except Exception as e:
+            print(f"Error evaluating answer: {str(e)}")
+            is_correct, question_feedback = False, "Error evaluating answer. Please try again."
+        record_grade(index, question, is_correct, question_feedback)
     
+    result = db.session.execute(
+        update(Assignment)
+        .where(Assignment.id == assignment_id, Assignment.version_id == assignment_version)
+        .values(
+            student_answer=answers,
+            ai_feedback=feedback,
+            completed=True,
+            total_points=total_points,
+            earned_points=earned_points,
+            version_id=assignment_version + 1
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        db.session.rollback()
+        return jsonify({"error": "This assignment was changed by another request while it was being graded. Please reload and submit again."}), 409
+    invalidate_user_aggregates(current_user.id)
     db.session.commit()
     print({
         "message": "Assignment submitted successfully",
@@ -806,8 +1855,35 @@ def submit_assignment(id):
 @app.route('/todos')
 @login_required
 def todos():
-    todos = Todo.query.filter_by(user_id=current_user.id).order_by(Todo.priority.desc(), Todo.due_date).all()
-    return render_template('todos.html', todos=todos)
+    # One independently paged list per priority column; each is a range of
+    # the (user_id, priority, due_date) index
+    per_page = get_per_page()
+    lists = {}
+    try:
+        for name, priority in (('high', 2), ('medium', 1), ('low', 0)):
+            lists[name] = keyset_page(
+                select(Todo).where(Todo.user_id == current_user.id, Todo.priority == priority),
+                [(Todo.due_date, False), (Todo.id, False)],
+                request.args.get(f'{name}_cursor'), per_page
+            )
+    except ValueError:
+        return invalid_cursor_response('todos')
+    
+    if wants_json():
+        return jsonify({
+            name: {
+                "items": [{
+                    "id": todo.id,
+                    "title": todo.title,
+                    "description": todo.description,
+                    "due_date": isoformat_or_none(todo.due_date),
+                    "priority": todo.priority,
+                    "completed": todo.completed
+                } for todo in items],
+                "next_cursor": next_cursor
+            } for name, (items, next_cursor) in lists.items()
+        })
+    return render_template('todos.html', lists=lists)
 
 @app.route('/todos', methods=['POST'])
 @login_required
@@ -822,6 +1898,7 @@ def create_todo():
         created_at=datetime.now(timezone.utc)
     )
     db.session.add(todo)
+    invalidate_user_aggregates(current_user.id)
     db.session.commit()
     return jsonify({'message': 'Todo created successfully', 'id': todo.id})
 
@@ -844,6 +1921,8 @@ def update_todo(id):
     if 'completed' in data:
         todo.completed = data['completed']
     
+    
+    invalidate_user_aggregates(current_user.id)
     db.session.commit()
     return jsonify({'message': 'Todo updated successfully'})
 
@@ -855,56 +1934,66 @@ def delete_todo(id):
         return jsonify({'error': 'Unauthorized'}), 403
     
     db.session.delete(todo)
+    invalidate_user_aggregates(current_user.id)
     db.session.commit()
     return jsonify({'message': 'Todo deleted successfully'})
 
 @app.route('/calendar')
 @login_required
 def calendar():
-    # Get todos and assignments for the current user
-    todos = Todo.query.filter_by(user_id=current_user.id).all()
-    assignments = Assignment.query.filter_by(user_id=current_user.id).all()
-    
-    # Convert todos and assignments to calendar events
-    events = []
-    
-    # Add todos
-    for todo in todos:
-        events.append({
-            'id': f'todo-{todo.id}',
-            'title': todo.title,
-            'start': todo.due_date.isoformat() if todo.due_date else None,
-            'end': todo.due_date.isoformat() if todo.due_date else None,
-            'extendedProps': {
-                'type': 'todo',
-                'description': todo.description,
-                'completed': todo.completed,
-                'priority': todo.priority
-            }
-        })
-    
-    # Add assignments
-    for assignment in assignments:
-        events.append({
-            'id': f'assignment-{assignment.id}',
-            'title': assignment.title,
-            'start': assignment.due_date.isoformat() if assignment.due_date else None,
-            'end': assignment.due_date.isoformat() if assignment.due_date else None,
-            'extendedProps': {
-                'type': 'assignment',
-                'description': assignment.description,
-                'completed': bool(assignment.student_answer),
-                'syllabus_id': assignment.syllabus_id
-            }
-        })
+    # Events are fetched per visible range from calendar_events
+    return render_template('calendar.html')
+
+def parse_calendar_bound(value):
+    # FullCalendar sends ISO 8601 with the browser's UTC offset; due dates are stored naive
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+
+@app.route('/calendar/events')
+@login_required
+def calendar_events():
+    try:
+        start = parse_calendar_bound(request.args['start'])
+        end = parse_calendar_bound(request.args['end'])
+    except KeyError:
+        return jsonify({"error": "start and end are required"}), 400
+    except ValueError:
+        return jsonify({"error": "start and end must be ISO 8601 dates"}), 400
+    if end <= start:
+        return jsonify({"error": "end must be after start"}), 400
     
-    return render_template('calendar.html', events=events)
+    etag, body = cached_user_aggregate(
+        current_user.id, ('calendar', start, end),
+        lambda user_id: build_calendar_events(user_id, start, end)
+    )
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'  # Always revalidate; unchanged windows get a 304
+    return response.make_conditional(request)
 
 @app.route('/study-plans')
 @login_required
 def study_plans():
-    user_plans = StudyPlan.query.filter_by(user_id=current_user.id).order_by(StudyPlan.created_at.desc()).all()
-    return render_template('study_plans.html', plans=user_plans)
+    try:
+        user_plans, next_cursor = keyset_page(
+            select(StudyPlan).where(StudyPlan.user_id == current_user.id),
+            [(StudyPlan.created_at, True), (StudyPlan.id, True)],
+            request.args.get('cursor'), get_per_page()
+        )
+    except ValueError:
+        return invalid_cursor_response('study_plans')
+    
+    if wants_json():
+        return jsonify({
+            "items": [{
+                "id": plan.id,
+                "title": plan.title,
+                "start_date": isoformat_or_none(plan.start_date),
+                "end_date": isoformat_or_none(plan.end_date),
+                "created_at": isoformat_or_none(plan.created_at)
+            } for plan in user_plans],
+            "next_cursor": next_cursor
+        })
+    return render_template('study_plans.html', plans=user_plans, next_cursor=next_cursor)
 
 @app.route('/study-plans/<int:id>')
 @login_required
@@ -923,30 +2012,25 @@ def generate_study_plan():
     start_date = datetime.fromisoformat(data.get('start_date'))
     end_date = datetime.fromisoformat(data.get('end_date'))
     
-    # Get all user's syllabi, assignments, and todos
-    syllabi = Syllabus.query.filter_by(user_id=current_user.id).all()
-    assignments = Assignment.query.filter_by(user_id=current_user.id).all()
-    todos = Todo.query.filter_by(user_id=current_user.id, completed=False).all()
+    # Get all user's syllabi, note topics, assignments, and todos
+    syllabi, topics, assignments, todos = get_study_plan_inputs(current_user.id)
     
     if not syllabi:
         return jsonify({"error": "You need at least one syllabus to generate a study plan"}), 400
     
+    # Everything the prompt needs is in plain rows; release the connection for the LLM call
+    user_id = current_user.id
+    db.session.close()
+    
     # Prepare data for OpenAI
     syllabi_data = []
     for syllabus in syllabi:
-        notes = Note.query.filter_by(syllabus_id=syllabus.id).all()
-        topics = {}
-        for note in notes:
-            if note.topic not in topics:
-                topics[note.topic] = []
-            topics[note.topic].append(note.subtopic)
-        
         syllabus_assignments = [a for a in assignments if a.syllabus_id == syllabus.id]
         
         syllabi_data.append({
             "id": syllabus.id,
             "title": syllabus.title,
-            "topics": topics,
+            "topics": topics.get(syllabus.id, {}),
             "assignments": [{"id": a.id, "title": a.title, "due_date": a.due_date.isoformat() if a.due_date else None} for a in syllabus_assignments]
         })
     
@@ -955,7 +2039,8 @@ def generate_study_plan():
     
     try:
         # Generate study plan with OpenAI
-        response = client.chat.completions.create(
+        content = complete_chat(
+            'study_plan',
             model="o4-mini",
             messages=[
                 {"role": "system", "content": """You are an expert academic planner. Your task is to create a comprehensive study plan based on the user's syllabi, assignments, and todos.
@@ -1006,9 +2091,6 @@ def generate_study_plan():
             response_format={"type": "json_object"}
         )
         
-        # Get the content from the response
-        content = response.choices[0].message.content
-        
         try:
             # Try to parse the JSON
             plan_data = json.loads(content)
@@ -1021,8 +2103,8 @@ def generate_study_plan():
             title=plan_data['title'],
             start_date=start_date,
             end_date=end_date,
-            user_id=current_user.id,
-            content=content,
+            user_id=user_id,
+            content=plan_data,
             created_at=datetime.now(timezone.utc)
         )
         
@@ -1034,44 +2116,92 @@ def generate_study_plan():
             "id": plan.id,
             "plan": plan_data
         })
+    except LLMUnavailableError as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         print(f"Error generating study plan: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+# Response compression
+# Buffered HTML/JSON responses are gzipped on the way out. Streamed responses
+# (chat SSE, file downloads) and bodies that are already encoded or are
+# compressed formats such as PDF and PNG are left alone.
+@app.after_request
+def compress_response(response):
+    if (not app.config['COMPRESS_ENABLED']
+            or response.direct_passthrough
+            or response.is_streamed
+            or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in app.config['COMPRESS_MIMETYPES']
+            or not request.accept_encodings['gzip']):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < app.config['COMPRESS_MIN_SIZE']:
+        return response
+    
+    response.set_data(gzip.compress(data, compresslevel=app.config['COMPRESS_LEVEL'], mtime=0))
+    response.headers['Content-Encoding'] = 'gzip'
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        # Still matches If-None-Match for the same content, which uses weak comparison
+        response.set_etag(etag, weak=True)
+    return response
+
+# Static assets
+# Text assets are served from memory, gzip/brotli-encoded per Accept-Encoding.
+# Templates link them through static_url(), which points at the content-hashed
+# name; those responses never change and are cached for a year.
+static_assets = load_static_assets(app.static_folder)
+
+@app.template_global()
+def static_url(filename):
+    asset = static_assets.get(filename)
+    return url_for('static', filename=asset.fingerprinted_name if asset else filename)
+
+def send_static_asset(asset, immutable=False):
+    encoding, body = asset.negotiate(request.accept_encodings)
+    response = Response(body, mimetype=asset.mimetype)
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.set_etag(f"{asset.digest[:32]}-{encoding}")
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable' if immutable else 'no-cache'
+    return response.make_conditional(request)
+
+def serve_static(filename):
+    asset = static_assets.get(filename)
+    if asset is None:
+        return app.send_static_file(filename)
+    return send_static_asset(asset, immutable=filename == asset.fingerprinted_name)
+
+app.view_functions['static'] = serve_static
+
 # PWA service worker route
 @app.route('/service-worker.js')
 def service_worker():
-    return send_from_directory('static/js', 'service-worker.js')
+    # Served from a fixed URL so browsers can check it for updates
+    return send_static_asset(static_assets['js/service-worker.js'])
 
 # PWA offline route
 @app.route('/offline')
 def offline():
     return render_template('offline.html')
 
-# PWA icon routes
-@app.route('/static/images/<icon>')
-def serve_pwa_icon(icon):
-    # Check if the icon is already created
-    icon_path = os.path.join('static', 'images', icon)
-    if os.path.exists(icon_path):
-        return send_file(icon_path)
-    
-    # Parse icon name to determine size
-    if icon.startswith('icon-'):
-        try:
-            sizes = icon.replace('icon-', '').replace('.png', '').split('x')
-            width = int(sizes[0])
-            height = int(sizes[1]) if len(sizes) > 1 else width
-        except (ValueError, IndexError):
-            width = height = 512
-    elif icon.startswith('favicon-'):
-        try:
-            width = height = int(icon.replace('favicon-', '').replace('.png', '').split('x')[0])
-        except (ValueError, IndexError):
-            width = height = 32
-    else:
-        width = height = 512
-    
+# PWA icons
+# Every icon the app links to is loaded (or drawn, if missing from static/images)
+# once at startup and served from memory. Other icon-* / favicon-* names are
+# answered with the nearest size of the same kind, so clients can't make the
+# server draw or write arbitrary images.
+PWA_LINKED_ICONS = [  # Referenced from base.html in addition to manifest.json
+    'icon-152x152.png', 'icon-167x167.png', 'icon-180x180.png',
+    'favicon-16x16.png', 'favicon-32x32.png',
+]
+PWA_ICON_PATTERN = re.compile(r'^(icon|favicon)-(\d+)(?:x(\d+))?\.png$')
+
+def render_pwa_icon(width, height):
     # Create a simple colored icon with text
     img = Image.new('RGBA', (width, height), color=(79, 70, 229, 255))  # Indigo color
     
@@ -1096,11 +2226,137 @@ def serve_pwa_icon(icon):
         # Draw the text
         draw.text(position, text, fill=(255, 255, 255, 255), font=font)
     
-    # Save the icon
-    os.makedirs(os.path.dirname(icon_path), exist_ok=True)
-    img.save(icon_path, format="PNG")
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def load_pwa_icons():
+    """Return {file name: (png bytes, etag)} for every icon in manifest.json and PWA_LINKED_ICONS."""
+    with open(os.path.join(app.static_folder, 'manifest.json')) as manifest_file:
+        manifest = json.load(manifest_file)
+    names = [os.path.basename(icon['src']) for icon in manifest.get('icons', [])] + PWA_LINKED_ICONS
+    
+    icons = {}
+    for name in names:
+        match = PWA_ICON_PATTERN.match(name)
+        if not match or name in icons:
+            continue
+        icon_path = os.path.join(app.static_folder, 'images', name)
+        if os.path.exists(icon_path):
+            with open(icon_path, 'rb') as icon_file:
+                data = icon_file.read()
+        else:
+            width = int(match.group(2))
+            data = render_pwa_icon(width, int(match.group(3) or width))
+        icons[name] = (data, hashlib.sha256(data).hexdigest()[:32])
+    return icons
+
+def nearest_pwa_icon(name):
+    match = PWA_ICON_PATTERN.match(name)
+    if not match:
+        return None
+    kind, size = match.group(1), int(match.group(2))
+    candidates = [icon for icon in pwa_icons if icon.startswith(kind + '-')]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda icon: abs(int(PWA_ICON_PATTERN.match(icon).group(2)) - size))
+
+pwa_icons = load_pwa_icons()
+
+@app.route('/static/images/<icon>')
+def serve_pwa_icon(icon):
+    if icon not in pwa_icons:
+        nearest = nearest_pwa_icon(icon)
+        if nearest is None:
+            # Not an icon: photos and other images are served from disk
+            return send_from_directory(os.path.join(app.static_folder, 'images'), icon)
+        icon = nearest
+    
+    data, etag = pwa_icons[icon]
+    response = Response(data, mimetype='image/png')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response.make_conditional(request)
+
+# CLI commands
+@app.cli.command('benchmark-extraction')
+@click.argument('pdf_path', default=os.path.join('testing', '596945-2023-2025-syllabus.pdf'))
+@click.option('--workers', default=None, type=int, help='Worker processes for the parallel run.')
+@click.option('--repeat', default=3, help='Timed runs per mode.')
+def benchmark_extraction(pdf_path, workers, repeat):
+    """Compare serial and process-pool PDF text extraction."""
+    workers = workers or app.config['PDF_EXTRACT_WORKERS']
+    page_count = pdf_extraction.count_pages(pdf_path)
+    click.echo(f"{pdf_path}: {page_count} pages")
+    
+    modes = [('serial', {'workers': 1}), (f'parallel x{workers}', {'workers': workers, 'serial_max_pages': 0})]
+    # Warm up the pool so process start-up is not counted against the parallel run
+    pdf_extraction.extract_pages(pdf_path, workers=workers, serial_max_pages=0)
+    for name, options in modes:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            pages = pdf_extraction.extract_pages(pdf_path, **options)
+            timings.append(time.perf_counter() - started)
+        click.echo(f"{name:>14}: best {min(timings) * 1000:.1f} ms, {sum(len(page) for page in pages)} chars")
+
+@app.cli.command('benchmark-compression')
+@click.argument('paths', nargs=-1)
+@click.option('--user', 'username', default=None, help='Render the pages as this user.')
+@click.option('--repeat', default=20, help='Compressions timed per level.')
+def benchmark_compression(paths, username, repeat):
+    """Measure gzip CPU time against bytes saved for rendered pages."""
+    client = app.test_client()
+    if username:
+        user = User.query.filter_by(username=username).first()
+        if not user:
+            raise click.ClickException(f"No user named {username}")
+        with client.session_transaction() as session_data:
+            session_data['_user_id'] = str(user.id)
+            session_data['_fresh'] = True
+    paths = paths or (('/dashboard', '/assignments', '/syllabi', '/study-plans') if username else ('/', '/login'))
+    levels = sorted({1, app.config['COMPRESS_LEVEL'], 9})
     
-    return send_file(icon_path)
+    for path in paths:
+        response = client.get(path, headers={'Accept-Encoding': 'identity'})
+        data = response.get_data()
+        click.echo(f"{path}: HTTP {response.status_code}, {len(data)} bytes")
+        for level in levels:
+            started = time.perf_counter()
+            for _ in range(repeat):
+                compressed = gzip.compress(data, compresslevel=level, mtime=0)
+            elapsed = (time.perf_counter() - started) / repeat
+            saved = len(data) - len(compressed)
+            click.echo(
+                f"  level {level}: {len(compressed)} bytes ({saved / max(len(data), 1):.0%} saved), "
+                f"{elapsed * 1000:.2f} ms, {saved / 1024 / max(elapsed, 1e-9) / 1000:.0f} KiB saved per CPU-ms"
+            )
+
+@app.cli.command('backfill-markdown')
+@click.option('--batch-size', default=200, help='Rows rendered per commit.')
+def backfill_markdown(batch_size):
+    """Render and store HTML for notes and syllabi saved before it was pre-rendered."""
+    for model in (Note, Syllabus):
+        rendered = 0
+        while True:
+            rows = model.query.filter(model.content_html.is_(None), model.content.isnot(None)).limit(batch_size).all()
+            if not rows:
+                break
+            for row in rows:
+                row.content_html = markdown_to_html(row.content)
+            db.session.commit()
+            rendered += len(rows)
+        click.echo(f"{model.__tablename__}: rendered {rendered} rows")
+
+@app.cli.command('llm-cache')
+@click.option('--clear', is_flag=True, help='Remove every cached response.')
+def llm_cache_command(clear):
+    """Show LLM response cache statistics."""
+    if clear:
+        llm_cache.clear()
+        click.echo("LLM cache cleared")
+    for name, value in llm_cache.stats().items():
+        click.echo(f"{name}: {value}")
 
 if __name__ == '__main__':
     with app.app_context():
@@ -0,0 +1,192 @@
+"""Content-addressed cache for LLM completions.
+
+Entries are keyed by a hash of (model, messages, response_format). Lookups go
+through a small in-process LRU first and then an optional SQLite file shared
+by every worker process. Both tiers honour the same TTL; the SQLite tier is
+trimmed back to its size limit by least recent use.
+
+The SQLite tier fails open: a locked or broken file counts as a miss and the
+write is skipped, so the cache can never fail the LLM call it sits in front of.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# How many writes go by between trims of the SQLite tier
+DISK_TRIM_INTERVAL = 64
+# Disk hits are collected and their last_used times written in one batch
+DISK_TOUCH_BATCH = 64
+
+
+class LLMCache:
+    def __init__(self, path=None, ttl=86400, max_entries=1024, disk_max_entries=50000, busy_timeout=0.5):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.disk_max_entries = disk_max_entries
+        self.busy_timeout = busy_timeout
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_errors = 0
+        self._memory = OrderedDict()  # key -> (expires_at, value)
+        self._touched = {}  # key -> last_used, waiting to be written to disk
+        self._lock = threading.Lock()  # Guards the in-memory state only; never held during disk I/O
+        self._writes = 0
+        self._local = threading.local()  # One SQLite connection per thread
+        if path:
+            try:
+                db = self._connection()
+                db.execute('PRAGMA journal_mode=WAL')
+                db.execute(
+                    'CREATE TABLE IF NOT EXISTS llm_cache ('
+                    'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, last_used REAL NOT NULL)'
+                )
+                db.commit()
+            except sqlite3.Error as e:
+                self._disk_error('open', e)
+
+    @staticmethod
+    def make_key(model, messages, response_format=None):
+        payload = json.dumps(
+            {'model': model, 'messages': messages, 'response_format': response_format},
+            sort_keys=True, separators=(',', ':')
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[0] > now:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                del self._memory[key]
+
+        row = None
+        if self.path:
+            try:
+                row = self._connection().execute(
+                    'SELECT value, expires_at FROM llm_cache WHERE key = ? AND expires_at > ?', (key, now)
+                ).fetchone()
+            except sqlite3.Error as e:
+                self._disk_error('read', e)
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self._remember(key, row[1], row[0])
+            self._touched[key] = now
+            self.hits += 1
+            self.disk_hits += 1
+            touched = self._take_touched() if len(self._touched) >= DISK_TOUCH_BATCH else None
+        if touched:
+            self._write_disk(touched)
+        return row[0]
+
+    def set(self, key, value):
+        now = time.time()
+        expires_at = now + self.ttl
+        with self._lock:
+            self._remember(key, expires_at, value)
+            if not self.path:
+                return
+            self._writes += 1
+            trim = self._writes % DISK_TRIM_INTERVAL == 0
+            touched = self._take_touched()
+        self._write_disk(touched, (key, value, expires_at, now), trim=trim)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+        if self.path:
+            db = None
+            try:
+                db = self._connection()
+                db.execute('DELETE FROM llm_cache')
+                db.commit()
+            except sqlite3.Error as e:
+                self._rollback(db)
+                self._disk_error('clear', e)
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'disk_errors': self.disk_errors,
+                'memory_entries': len(self._memory),
+            }
+        if self.path:
+            try:
+                stats['disk_entries'] = self._connection().execute('SELECT COUNT(*) FROM llm_cache').fetchone()[0]
+            except sqlite3.Error as e:
+                self._disk_error('count', e)
+                stats['disk_entries'] = None
+        return stats
+
+    def _connection(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=self.busy_timeout)
+            self._local.db = db
+        return db
+
+    def _remember(self, key, expires_at, value):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _take_touched(self):
+        touched, self._touched = self._touched, {}
+        return touched
+
+    def _write_disk(self, touched, entry=None, trim=False):
+        db = None
+        try:
+            db = self._connection()
+            if entry:
+                db.execute(
+                    'INSERT OR REPLACE INTO llm_cache (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)', entry
+                )
+            if touched:
+                db.executemany(
+                    'UPDATE llm_cache SET last_used = ? WHERE key = ?',
+                    [(last_used, key) for key, last_used in touched.items()]
+                )
+            if trim:
+                self._trim_disk(db, entry[3] if entry else time.time())
+            db.commit()
+        except sqlite3.Error as e:
+            self._rollback(db)
+            self._disk_error('write', e)
+
+    def _trim_disk(self, db, now):
+        db.execute('DELETE FROM llm_cache WHERE expires_at <= ?', (now,))
+        db.execute(
+            'DELETE FROM llm_cache WHERE key IN '
+            '(SELECT key FROM llm_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)',
+            (self.disk_max_entries,)
+        )
+
+    @staticmethod
+    def _rollback(db):
+        if db is not None:
+            try:
+                db.rollback()
+            except sqlite3.Error:
+                pass
+
+    def _disk_error(self, action, error):
+        with self._lock:
+            self.disk_errors += 1
+        print(f"LLM cache {action} failed ({error}); continuing without the disk tier")
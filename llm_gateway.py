@@ -0,0 +1,238 @@
+"""Single gateway for every call to the LLM provider.
+
+The gateway owns the HTTP connection pool and applies, per call:
+- a per-route timeout,
+- exponential backoff with full jitter on 429/5xx/connection errors,
+- a cap on concurrent in-flight requests (callers wait briefly, then fail),
+- a circuit breaker that fails fast while the upstream is unhealthy.
+
+The network sits behind a transport object, so ``FakeTransport`` can stand in
+for ``OpenAITransport`` to exercise all of the above offline.
+"""
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+from openai import OpenAI, APIConnectionError
+
+
+class LLMUnavailableError(Exception):
+    """Raised instead of calling the upstream when it is unhealthy or saturated."""
+
+
+class CircuitOpenError(LLMUnavailableError):
+    pass
+
+
+class TransportError(Exception):
+    """Error with an HTTP status, raised by fake transports to simulate upstream failures."""
+
+    def __init__(self, status_code, message=None):
+        super().__init__(message or f"Upstream returned HTTP {status_code}")
+        self.status_code = status_code
+
+
+def is_retryable(error):
+    if isinstance(error, APIConnectionError):  # Includes timeouts
+        return True
+    status_code = getattr(error, 'status_code', None)
+    return status_code is not None and (status_code == 429 or status_code >= 500)
+
+
+def retry_after(error):
+    # Honour the upstream's Retry-After header when it sends one
+    response = getattr(error, 'response', None)
+    try:
+        return float(response.headers.get('retry-after'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class OpenAITransport:
+    def __init__(self, api_key, max_connections=20, max_keepalive_connections=10):
+        self.http_client = httpx.Client(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections)
+        )
+        # Retries are handled by the gateway, not the SDK
+        self.client = OpenAI(api_key=api_key, http_client=self.http_client, max_retries=0)
+
+    def chat_completion(self, timeout, **kwargs):
+        return self.client.chat.completions.create(timeout=timeout, **kwargs)
+
+    def delete_file(self, file_id, timeout):
+        return self.client.files.delete(file_id, timeout=timeout)
+
+
+class FakeTransport:
+    """Offline transport. ``handler(**request)`` returns the completion text or an
+    exception to raise; every request is recorded in ``calls``."""
+
+    def __init__(self, handler=None):
+        self.handler = handler or (lambda **request: "")
+        self.calls = []
+        self.deleted_files = []
+
+    def chat_completion(self, timeout, **kwargs):
+        self.calls.append(kwargs)
+        result = self.handler(**kwargs)
+        if isinstance(result, Exception):
+            raise result
+        if kwargs.get('stream'):
+            return iter([
+                SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token + ' '))])
+                for token in result.split(' ')
+            ])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=result))])
+
+    def delete_file(self, file_id, timeout):
+        self.deleted_files.append(file_id)
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive failures and lets a single
+    trial call through once ``reset_timeout`` seconds have passed."""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self.opened_at is None:
+                return 'closed'
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                return 'half-open'
+            return 'open'
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_timeout or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class ReleasingStream:
+    """Iterates a streamed completion and releases its in-flight slot exactly once,
+    when the stream ends, fails, or is closed or garbage collected unread."""
+
+    def __init__(self, stream, release):
+        self._stream = iter(stream)
+        self._release = release
+        self._released = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._stream)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        if not self._released:
+            self._released = True
+            self._release()
+            close = getattr(self._stream, 'close', None)
+            if close:
+                close()
+
+    __del__ = close
+
+
+class LLMGateway:
+    def __init__(self, transport, timeouts=None, default_timeout=60, max_retries=3,
+                 backoff_base=0.5, backoff_max=8, max_in_flight=16, acquire_timeout=5, breaker=None):
+        self.transport = transport
+        self.timeouts = timeouts or {}
+        self.default_timeout = default_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.acquire_timeout = acquire_timeout
+        self.breaker = breaker or CircuitBreaker()
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+
+    def timeout_for(self, route):
+        return self.timeouts.get(route, self.default_timeout)
+
+    def chat_completion(self, route, **kwargs):
+        """Create a chat completion. With ``stream=True`` the in-flight slot is held
+        until the returned iterator is exhausted or closed."""
+        timeout = self.timeout_for(route)
+        if kwargs.get('stream'):
+            self._acquire(route)
+            try:
+                stream = self._call_with_retries(route, lambda: self.transport.chat_completion(timeout, **kwargs))
+            except BaseException:
+                self._slots.release()
+                raise
+            return ReleasingStream(stream, self._slots.release)
+
+        self._acquire(route)
+        try:
+            return self._call_with_retries(route, lambda: self.transport.chat_completion(timeout, **kwargs))
+        finally:
+            self._slots.release()
+
+    def delete_file(self, file_id, route='files'):
+        timeout = self.timeout_for(route)
+        self._acquire(route)
+        try:
+            return self._call_with_retries(route, lambda: self.transport.delete_file(file_id, timeout))
+        finally:
+            self._slots.release()
+
+    def _acquire(self, route):
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise LLMUnavailableError(f"Too many LLM requests in flight; gave up waiting for '{route}'")
+        if not self.breaker.allow():
+            self._slots.release()
+            raise CircuitOpenError(f"LLM circuit is open; failing fast for '{route}'")
+
+    def _call_with_retries(self, route, call):
+        attempt = 0
+        while True:
+            try:
+                result = call()
+            except Exception as e:
+                if not is_retryable(e):
+                    # The upstream answered; a bad request says nothing about its health
+                    self.breaker.record_success()
+                    raise
+                if attempt >= self.max_retries:
+                    self.breaker.record_failure()
+                    raise
+                delay = retry_after(e)
+                if delay is None:
+                    delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                print(f"LLM call for '{route}' failed ({e}); retrying in {delay:.2f}s")
+                time.sleep(min(delay, self.backoff_max))
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
@@ -0,0 +1,32 @@
+"""optimistic version columns
+
+Revision ID: 2f8b6c0d9e47
+Revises: 9a4d7e2c1b58
+Create Date: 2026-10-18 15:20:07.502391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2f8b6c0d9e47'
+down_revision = '9a4d7e2c1b58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('assignment', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version_id', sa.Integer(), nullable=False, server_default='1'))
+
+    with op.batch_alter_table('syllabus', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version_id', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade():
+    with op.batch_alter_table('syllabus', schema=None) as batch_op:
+        batch_op.drop_column('version_id')
+
+    with op.batch_alter_table('assignment', schema=None) as batch_op:
+        batch_op.drop_column('version_id')
@@ -0,0 +1,30 @@
+"""syllabus ingestion status
+
+Revision ID: 3b7c9e2d41a6
+Revises: fa5593678f5f
+Create Date: 2026-10-18 09:12:04.518230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7c9e2d41a6'
+down_revision = 'fa5593678f5f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('syllabus', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('status', sa.String(length=20), nullable=False, server_default='ready'))
+        batch_op.add_column(sa.Column('status_error', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('status_updated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('syllabus', schema=None) as batch_op:
+        batch_op.drop_column('status_updated_at')
+        batch_op.drop_column('status_error')
+        batch_op.drop_column('status')
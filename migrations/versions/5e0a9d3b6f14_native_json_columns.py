@@ -0,0 +1,112 @@
+"""native json columns for answers, feedback and study plans
+
+Revision ID: 5e0a9d3b6f14
+Revises: c41e5b8f2a07
+Create Date: 2026-10-18 12:08:51.904127
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e0a9d3b6f14'
+down_revision = 'c41e5b8f2a07'
+branch_labels = None
+depends_on = None
+
+LIST_ANSWER_TYPES = ('ordering', 'drag_drop')
+
+question = sa.table(
+    'question',
+    sa.column('id', sa.Integer),
+    sa.column('question_type', sa.String),
+    sa.column('correct_answer', sa.Text),
+)
+assignment = sa.table(
+    'assignment',
+    sa.column('id', sa.Integer),
+    sa.column('student_answer', sa.Text),
+    sa.column('ai_feedback', sa.Text),
+)
+study_plan = sa.table(
+    'study_plan',
+    sa.column('id', sa.Integer),
+    sa.column('content', sa.Text),
+)
+
+
+def loads_or_none(value):
+    try:
+        return json.loads(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    # correct_answer held raw text for most types and a JSON array for ordering/drag_drop;
+    # encode every value as JSON so the column can be read as native JSON
+    question_types = {}
+    for question_id, question_type, correct_answer in bind.execute(
+            sa.select(question.c.id, question.c.question_type, question.c.correct_answer)).all():
+        question_types[f"q{question_id}"] = question_type
+        if question_type in LIST_ANSWER_TYPES and isinstance(loads_or_none(correct_answer), list):
+            continue
+        bind.execute(question.update().where(question.c.id == question_id)
+                     .values(correct_answer=json.dumps(correct_answer)))
+
+    # Ordering/drag_drop answers were stored as JSON strings nested inside the answers object
+    for assignment_id, student_answer, ai_feedback in bind.execute(
+            sa.select(assignment.c.id, assignment.c.student_answer, assignment.c.ai_feedback)).all():
+        answers = loads_or_none(student_answer)
+        if isinstance(answers, dict):
+            for key, value in answers.items():
+                if question_types.get(key) in LIST_ANSWER_TYPES and isinstance(value, str):
+                    answers[key] = loads_or_none(value) or []
+        bind.execute(assignment.update().where(assignment.c.id == assignment_id).values(
+            student_answer=json.dumps(answers) if answers is not None else None,
+            ai_feedback=ai_feedback if loads_or_none(ai_feedback) is not None else None,
+        ))
+
+    for plan_id, content in bind.execute(sa.select(study_plan.c.id, study_plan.c.content)).all():
+        if content is not None and loads_or_none(content) is None:
+            bind.execute(study_plan.update().where(study_plan.c.id == plan_id).values(content=None))
+
+    with op.batch_alter_table('question', schema=None) as batch_op:
+        batch_op.alter_column('correct_answer', existing_type=sa.Text(), type_=sa.JSON(), existing_nullable=False)
+
+    with op.batch_alter_table('assignment', schema=None) as batch_op:
+        batch_op.alter_column('student_answer', existing_type=sa.Text(), type_=sa.JSON(), existing_nullable=True)
+        batch_op.alter_column('ai_feedback', existing_type=sa.Text(), type_=sa.JSON(), existing_nullable=True)
+
+    with op.batch_alter_table('study_plan', schema=None) as batch_op:
+        batch_op.alter_column('content', existing_type=sa.Text(), type_=sa.JSON(), existing_nullable=True)
+
+
+def downgrade():
+    with op.batch_alter_table('study_plan', schema=None) as batch_op:
+        batch_op.alter_column('content', existing_type=sa.JSON(), type_=sa.Text(), existing_nullable=True)
+
+    with op.batch_alter_table('assignment', schema=None) as batch_op:
+        batch_op.alter_column('ai_feedback', existing_type=sa.JSON(), type_=sa.Text(), existing_nullable=True)
+        batch_op.alter_column('student_answer', existing_type=sa.JSON(), type_=sa.Text(), existing_nullable=True)
+
+    with op.batch_alter_table('question', schema=None) as batch_op:
+        batch_op.alter_column('correct_answer', existing_type=sa.JSON(), type_=sa.Text(), existing_nullable=False)
+
+    bind = op.get_bind()
+    for question_id, correct_answer in bind.execute(sa.select(question.c.id, question.c.correct_answer)).all():
+        value = loads_or_none(correct_answer)
+        if isinstance(value, str):
+            bind.execute(question.update().where(question.c.id == question_id).values(correct_answer=value))
+
+    for assignment_id, student_answer in bind.execute(sa.select(assignment.c.id, assignment.c.student_answer)).all():
+        answers = loads_or_none(student_answer)
+        if isinstance(answers, dict):
+            answers = {key: json.dumps(value) if isinstance(value, list) else value for key, value in answers.items()}
+            bind.execute(assignment.update().where(assignment.c.id == assignment_id)
+                         .values(student_answer=json.dumps(answers)))
@@ -0,0 +1,26 @@
+"""syllabus extracted text
+
+Revision ID: 8d2f6a1c7e93
+Revises: 3b7c9e2d41a6
+Create Date: 2026-10-18 10:03:47.201955
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2f6a1c7e93'
+down_revision = '3b7c9e2d41a6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('syllabus', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('extracted_text', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('syllabus', schema=None) as batch_op:
+        batch_op.drop_column('extracted_text')
@@ -0,0 +1,58 @@
+"""user and parent scoped indexes
+
+Revision ID: 9a4d7e2c1b58
+Revises: 5e0a9d3b6f14
+Create Date: 2026-10-18 14:02:41.118734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a4d7e2c1b58'
+down_revision = '5e0a9d3b6f14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('syllabus', schema=None) as batch_op:
+        batch_op.create_index('ix_syllabus_user_id_created_at', ['user_id', 'created_at'], unique=False)
+
+    with op.batch_alter_table('note', schema=None) as batch_op:
+        batch_op.create_index('ix_note_syllabus_id_order', ['syllabus_id', 'order'], unique=False)
+
+    with op.batch_alter_table('assignment', schema=None) as batch_op:
+        batch_op.create_index('ix_assignment_user_id_due_date', ['user_id', 'due_date'], unique=False)
+        batch_op.create_index('ix_assignment_syllabus_id', ['syllabus_id'], unique=False)
+
+    with op.batch_alter_table('question', schema=None) as batch_op:
+        batch_op.create_index('ix_question_assignment_id_order', ['assignment_id', 'order'], unique=False)
+
+    with op.batch_alter_table('todo', schema=None) as batch_op:
+        batch_op.create_index('ix_todo_user_id_priority_due_date', ['user_id', 'priority', 'due_date'], unique=False)
+
+    with op.batch_alter_table('study_plan', schema=None) as batch_op:
+        batch_op.create_index('ix_study_plan_user_id_created_at', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('study_plan', schema=None) as batch_op:
+        batch_op.drop_index('ix_study_plan_user_id_created_at')
+
+    with op.batch_alter_table('todo', schema=None) as batch_op:
+        batch_op.drop_index('ix_todo_user_id_priority_due_date')
+
+    with op.batch_alter_table('question', schema=None) as batch_op:
+        batch_op.drop_index('ix_question_assignment_id_order')
+
+    with op.batch_alter_table('assignment', schema=None) as batch_op:
+        batch_op.drop_index('ix_assignment_syllabus_id')
+        batch_op.drop_index('ix_assignment_user_id_due_date')
+
+    with op.batch_alter_table('note', schema=None) as batch_op:
+        batch_op.drop_index('ix_note_syllabus_id_order')
+
+    with op.batch_alter_table('syllabus', schema=None) as batch_op:
+        batch_op.drop_index('ix_syllabus_user_id_created_at')
@@ -0,0 +1,28 @@
+"""syllabus job heartbeat
+
+Revision ID: a8c3e6f0b274
+Revises: e7c2a4f9d135
+Create Date: 2026-10-18 21:42:07.305914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8c3e6f0b274'
+down_revision = 'e7c2a4f9d135'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('syllabus', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('job_owner', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('job_heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('syllabus', schema=None) as batch_op:
+        batch_op.drop_column('job_heartbeat_at')
+        batch_op.drop_column('job_owner')
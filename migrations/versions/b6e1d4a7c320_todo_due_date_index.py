@@ -0,0 +1,27 @@
+"""todo due date index
+
+Revision ID: b6e1d4a7c320
+Revises: 2f8b6c0d9e47
+Create Date: 2026-10-18 15:51:33.870216
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e1d4a7c320'
+down_revision = '2f8b6c0d9e47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Serves the calendar's due-date range queries
+    with op.batch_alter_table('todo', schema=None) as batch_op:
+        batch_op.create_index('ix_todo_user_id_due_date', ['user_id', 'due_date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('todo', schema=None) as batch_op:
+        batch_op.drop_index('ix_todo_user_id_due_date')
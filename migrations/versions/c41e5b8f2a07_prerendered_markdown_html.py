@@ -0,0 +1,33 @@
+"""pre-rendered markdown html
+
+Revision ID: c41e5b8f2a07
+Revises: 8d2f6a1c7e93
+Create Date: 2026-10-18 11:26:15.730418
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41e5b8f2a07'
+down_revision = '8d2f6a1c7e93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing rows are rendered by `flask backfill-markdown`
+    with op.batch_alter_table('note', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_html', sa.Text(), nullable=True))
+
+    with op.batch_alter_table('syllabus', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_html', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('syllabus', schema=None) as batch_op:
+        batch_op.drop_column('content_html')
+
+    with op.batch_alter_table('note', schema=None) as batch_op:
+        batch_op.drop_column('content_html')
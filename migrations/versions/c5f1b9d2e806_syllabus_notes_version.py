@@ -0,0 +1,26 @@
+"""syllabus notes version
+
+Revision ID: c5f1b9d2e806
+Revises: a8c3e6f0b274
+Create Date: 2026-10-18 22:16:53.870412
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5f1b9d2e806'
+down_revision = 'a8c3e6f0b274'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('syllabus', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('notes_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('syllabus', schema=None) as batch_op:
+        batch_op.drop_column('notes_version')
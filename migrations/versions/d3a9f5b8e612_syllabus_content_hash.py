@@ -0,0 +1,29 @@
+"""syllabus content hash
+
+Revision ID: d3a9f5b8e612
+Revises: b6e1d4a7c320
+Create Date: 2026-10-18 17:12:54.640193
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3a9f5b8e612'
+down_revision = 'b6e1d4a7c320'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing uploads keep their per-user file names and are not deduplicated
+    with op.batch_alter_table('syllabus', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+        batch_op.create_index(batch_op.f('ix_syllabus_content_hash'), ['content_hash'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('syllabus', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_syllabus_content_hash'))
+        batch_op.drop_column('content_hash')
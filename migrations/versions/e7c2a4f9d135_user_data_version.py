@@ -0,0 +1,26 @@
+"""user data version
+
+Revision ID: e7c2a4f9d135
+Revises: d3a9f5b8e612
+Create Date: 2026-10-18 19:04:31.518226
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7c2a4f9d135'
+down_revision = 'd3a9f5b8e612'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('data_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('data_version')
@@ -0,0 +1,105 @@
+"""Page-parallel PDF text extraction.
+
+Kept free of Flask/app imports so that process-pool workers can import it
+cheaply: pages are sharded into contiguous ranges, each worker opens the PDF
+once and extracts its range, and the results are joined back in page order.
+"""
+import atexit
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+import PyPDF2
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def count_pages(file_path):
+    with open(file_path, 'rb') as pdf_file:
+        return len(PyPDF2.PdfReader(pdf_file).pages)
+
+
+def extract_page_range(file_path, start, end):
+    """Return the text of pages [start, end). Runs inside a worker process."""
+    with open(file_path, 'rb') as pdf_file:
+        pdf_reader = PyPDF2.PdfReader(pdf_file)
+        return [pdf_reader.pages[page_num].extract_text() or "" for page_num in range(start, end)]
+
+
+def get_pool(workers):
+    """Return the shared process pool, (re)creating it if the worker count changed."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers or getattr(_pool, '_broken', False):
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            # spawn rather than fork: the web process is multi-threaded
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_workers = workers
+        return _pool
+
+
+def discard_pool(pool):
+    """Shut a pool down and kill its workers so a hung extraction cannot keep holding them.
+
+    The next get_pool call starts a fresh pool. Other extractions still running
+    in the discarded pool fail with BrokenProcessPool.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    # cancel_futures alone cannot stop a shard that is already running
+    processes = list((getattr(pool, '_processes', None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    for process in processes:
+        process.join(timeout=5)
+
+
+@atexit.register
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+def extract_pages(file_path, workers=None, page_timeout=30, serial_max_pages=20):
+    """Extract the text of every page of a PDF, in page order.
+
+    Documents of at most ``serial_max_pages`` pages (or ``workers`` <= 1) are
+    extracted in-process. Larger ones are split into one contiguous shard per
+    worker and extracted in the shared process pool; a shard that runs longer
+    than ``page_timeout`` seconds per page raises ``TimeoutError``.
+    """
+    workers = workers or os.cpu_count() or 1
+    page_count = count_pages(file_path)
+    if workers <= 1 or page_count <= serial_max_pages:
+        return extract_page_range(file_path, 0, page_count)
+
+    shard_size = math.ceil(page_count / workers)
+    shards = [(start, min(start + shard_size, page_count)) for start in range(0, page_count, shard_size)]
+    pool = get_pool(workers)
+    futures = [pool.submit(extract_page_range, file_path, start, end) for start, end in shards]
+
+    pages = []
+    try:
+        for (start, end), future in zip(shards, futures):
+            pages.extend(future.result(timeout=page_timeout * (end - start)))
+    except FutureTimeoutError:
+        discard_pool(pool)
+        raise TimeoutError(f"PDF text extraction timed out on pages {start + 1}-{end} of {file_path}")
+    return pages
+
+
+def extract_text(file_path, **options):
+    """Extract a PDF's text as a single string, each page followed by a blank line."""
+    return "".join(page + "\n\n" for page in extract_pages(file_path, **options))
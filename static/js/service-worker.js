@@ -1,5 +1,5 @@
 // Service Worker for QwikLearn
-const CACHE_NAME = 'ai-learning-cache-v1';
+const CACHE_NAME = 'ai-learning-cache-v3';
 const ASSETS_TO_CACHE = [
   '/',
   '/login',
@@ -58,12 +58,19 @@ self.addEventListener('fetch', event => {
     return;
   }
   
-  // For API or dynamic routes (POST requests or routes that might change data)
+  const url = new URL(event.request.url);
+  const acceptsJson = (event.request.headers.get('Accept') || '').includes('application/json');
+  
+  // For API or dynamic routes (POST requests, JSON reads, or routes that might change data)
   if (
     event.request.method !== 'GET' ||
     event.request.url.includes('/generate') ||
     event.request.url.includes('/chat') ||
-    event.request.url.includes('/submit')
+    event.request.url.includes('/submit') ||
+    url.pathname.endsWith('/status') ||
+    url.pathname === '/calendar/events' ||  // Revalidated with the server's ETag on every request
+    url.searchParams.get('format') === 'json' ||
+    acceptsJson
   ) {
     // For API routes, try network only and fail gracefully
     event.respondWith(
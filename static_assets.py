@@ -0,0 +1,77 @@
+"""Precompressed, content-fingerprinted static assets.
+
+At startup every text asset under the static folder is read into memory
+together with its gzip encoding (and brotli, when the optional ``brotli``
+package is installed) and a content hash. Pages link to ``name.<hash>.ext`` so
+responses can be cached forever; the plain name keeps working for URLs that
+must stay stable, such as the service worker.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {'.js', '.json', '.css', '.svg', '.html', '.txt', '.map'}
+
+
+class StaticAsset:
+    def __init__(self, name, data, precompressed_gzip=None):
+        self.name = name
+        self.mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        self.digest = hashlib.sha256(data).hexdigest()
+        root, extension = os.path.splitext(name)
+        self.fingerprinted_name = f"{root}.{self.digest[:12]}{extension}"
+
+        self.encodings = {'identity': data}
+        # A shipped .gz is only trusted if it is a build of the current file
+        if precompressed_gzip is not None and _gunzip(precompressed_gzip) == data:
+            self.encodings['gzip'] = precompressed_gzip
+        else:
+            self.encodings['gzip'] = gzip.compress(data, compresslevel=9, mtime=0)
+        if brotli is not None:
+            self.encodings['br'] = brotli.compress(data, quality=11)
+
+    def negotiate(self, accept_encodings):
+        """Return (encoding, body): the smallest variant the client accepts."""
+        accepted = [
+            encoding for encoding in self.encodings
+            if encoding == 'identity' or accept_encodings[encoding]
+        ]
+        encoding = min(accepted, key=lambda encoding: len(self.encodings[encoding]))
+        return encoding, self.encodings[encoding]
+
+
+def _gunzip(data):
+    try:
+        return gzip.decompress(data)
+    except (OSError, EOFError):
+        return None
+
+
+def load_static_assets(static_folder, skip_dirs=('images',)):
+    """Index every compressible file under ``static_folder`` by both its
+    relative name and its fingerprinted name."""
+    assets = {}
+    for root, dirs, files in os.walk(static_folder):
+        if root == static_folder:
+            dirs[:] = [d for d in dirs if d not in skip_dirs]
+        for filename in files:
+            if os.path.splitext(filename)[1] not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            path = os.path.join(root, filename)
+            name = os.path.relpath(path, static_folder).replace(os.sep, '/')
+            with open(path, 'rb') as asset_file:
+                data = asset_file.read()
+            precompressed = None
+            if os.path.exists(path + '.gz'):
+                with open(path + '.gz', 'rb') as gz_file:
+                    precompressed = gz_file.read()
+            asset = StaticAsset(name, data, precompressed)
+            assets[name] = asset
+            assets[asset.fingerprinted_name] = asset
+    return assets
@@ -0,0 +1,78 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+
+# The app reads its configuration at import time: point it at a throwaway
+# database and keep the LLM cache in memory and off
+_data_dir = tempfile.mkdtemp(prefix='qwiklearn-tests-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_data_dir, 'test.db')
+os.environ['LLM_CACHE_PATH'] = ''
+os.environ['LLM_CACHE_ENABLED'] = '0'
+# Tests run the ingestion heartbeat and stale sweep by hand
+os.environ['INGESTION_HEARTBEAT_INTERVAL'] = '3600'
+os.environ.setdefault('OPENAI_API_KEY', 'test')
+
+import app as app_module  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from llm_gateway import CircuitBreaker, FakeTransport  # noqa: E402
+
+db = app_module.db
+
+
+@pytest.fixture
+def app(tmp_path):
+    flask_app = app_module.app
+    flask_app.config.update(TESTING=True, UPLOAD_FOLDER=str(tmp_path / 'uploads'))
+    os.makedirs(flask_app.config['UPLOAD_FOLDER'])
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+    app_module.aggregate_cache.clear()
+    yield flask_app
+    with flask_app.app_context():
+        db.session.remove()
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """Replace the OpenAI transport; set ``fake_llm.handler`` to script replies."""
+    transport = FakeTransport()
+    monkeypatch.setattr(app_module.llm, 'transport', transport)
+    monkeypatch.setattr(app_module.llm, 'breaker', CircuitBreaker())
+    return transport
+
+
+@pytest.fixture
+def client(app):
+    client = app.test_client()
+    client.post('/register', data={'username': 'student', 'email': 'student@example.com', 'password': 'secret'})
+    client.post('/login', data={'username': 'student', 'password': 'secret'})
+    return client
+
+
+@pytest.fixture
+def user_id(app, client):
+    with app.app_context():
+        return db.session.query(app_module.User.id).filter_by(username='student').scalar()
+
+
+@pytest.fixture
+def count_queries(app):
+    """``with count_queries() as statements:`` collects every SQL statement run inside the block."""
+    @contextmanager
+    def counter():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    return counter
@@ -0,0 +1,47 @@
+"""Cached dashboard and calendar aggregates follow writes made by any worker."""
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, update
+
+from conftest import app_module, db
+
+Todo, User = app_module.Todo, app_module.User
+
+
+def calendar_url():
+    today = datetime.utcnow().date()
+    return f'/calendar/events?start={today - timedelta(days=7)}&end={today + timedelta(days=7)}'
+
+
+def write_from_another_worker(app, user_id, title):
+    """Add a todo the way another process's write route would: the row and
+    the data_version bump in one transaction, invisible to this process's memory."""
+    with app.app_context(), db.engine.begin() as connection:
+        connection.execute(insert(Todo).values(
+            title=title, due_date=datetime.utcnow() + timedelta(days=1), priority=1, user_id=user_id
+        ))
+        connection.execute(update(User).where(User.id == user_id).values(data_version=User.data_version + 1))
+
+
+def test_calendar_feed_sees_writes_from_other_workers(app, client, user_id):
+    first = client.get(calendar_url())
+    assert first.status_code == 200 and first.json == []
+    assert client.get(calendar_url(), headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+
+    write_from_another_worker(app, user_id, 'Read chapter 3')
+
+    second = client.get(calendar_url(), headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 200
+    assert [event['title'] for event in second.json] == ['Read chapter 3']
+    assert second.headers['ETag'] != first.headers['ETag']
+
+
+def test_write_routes_invalidate_in_their_own_transaction(app, client, user_id):
+    assert client.get(calendar_url()).json == []
+    response = client.post('/todos', json={
+        'title': 'Lab report', 'priority': 2, 'due_date': (datetime.utcnow() + timedelta(days=2)).isoformat()
+    })
+    assert response.status_code < 400
+    with app.app_context():
+        assert db.session.get(User, user_id).data_version == 1
+    assert [event['title'] for event in client.get(calendar_url()).json] == ['Lab report']
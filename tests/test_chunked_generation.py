@@ -0,0 +1,60 @@
+"""Per-chunk generation replies are merged whole or not at all."""
+import json
+
+import pytest
+
+from conftest import app_module, db
+
+Syllabus, Note = app_module.Syllabus, app_module.Note
+
+
+def notes_part(content, key_point):
+    return json.dumps({"title": "Notes", "topics": [{"title": "Cells", "subtopics": [
+        {"title": "Membranes", "content": content, "key_points": [key_point], "examples": [], "summary": content}
+    ]}]})
+
+
+@pytest.fixture
+def syllabus_id(app, user_id, monkeypatch):
+    # Each paragraph of the syllabus becomes its own chunk
+    monkeypatch.setitem(app.config, 'LLM_CHUNK_TOKENS', 8)
+    with app.app_context():
+        syllabus = Syllabus(title='Biology', content='Part one about lipids.\n\nPart two about proteins.',
+                            user_id=user_id)
+        db.session.add(syllabus)
+        db.session.commit()
+        return syllabus.id
+
+
+def reply_by_part(replies):
+    """Answer each chunk from ``replies[part]``, a list consumed one call at a time."""
+    def handler(**request):
+        part = 'one' if 'Part one' in request['messages'][1]['content'] else 'two'
+        return replies[part].pop(0)
+    return handler
+
+
+def test_repeated_subtopics_keep_every_chunks_content(app, client, syllabus_id, fake_llm):
+    fake_llm.handler = reply_by_part({'one': [notes_part('Lipids', 'a')], 'two': [notes_part('Proteins', 'b')]})
+    response = client.post('/generate_notes', json={'syllabus_id': syllabus_id})
+    assert response.status_code == 200
+    with app.app_context():
+        [note] = Note.query.filter_by(syllabus_id=syllabus_id).all()
+    assert 'Lipids' in note.content and 'Proteins' in note.content
+    assert '- a\n- b' in note.content
+
+
+def test_a_chunk_with_invalid_json_is_requested_again(app, client, syllabus_id, fake_llm):
+    fake_llm.handler = reply_by_part({'one': [notes_part('Lipids', 'a')],
+                                      'two': ['{"topics": [', notes_part('Proteins', 'b')]})
+    response = client.post('/generate_notes', json={'syllabus_id': syllabus_id})
+    assert response.status_code == 200
+    assert len(fake_llm.calls) == 3
+
+
+def test_a_chunk_that_never_parses_fails_the_request(app, client, syllabus_id, fake_llm):
+    fake_llm.handler = reply_by_part({'one': [notes_part('Lipids', 'a')], 'two': ['not json', 'still not json']})
+    response = client.post('/generate_notes', json={'syllabus_id': syllabus_id})
+    assert response.status_code == 500
+    with app.app_context():
+        assert Note.query.filter_by(syllabus_id=syllabus_id).count() == 0
@@ -0,0 +1,89 @@
+"""Syllabus downloads, with Flask's test client standing in for the nginx/Apache front end."""
+import os
+
+import pytest
+
+from conftest import app_module, db
+
+PDF_BYTES = b'%PDF-1.4\n' + bytes(range(256)) * 64 + b'\n%%EOF\n'
+
+
+@pytest.fixture
+def download_url(app, user_id):
+    content_hash = 'ab' * 32
+    file_path = os.path.join(app.config['UPLOAD_FOLDER'], f'{content_hash}.pdf')
+    with open(file_path, 'wb') as pdf:
+        pdf.write(PDF_BYTES)
+    with app.app_context():
+        syllabus = app_module.Syllabus(title='Intro to Biology', file_path=file_path,
+                                       content_hash=content_hash, user_id=user_id)
+        db.session.add(syllabus)
+        db.session.commit()
+        return f'/syllabi/{syllabus.id}/download'
+
+
+@pytest.fixture
+def offload(app, monkeypatch):
+    def set_mode(mode):
+        monkeypatch.setitem(app.config, 'DOWNLOAD_OFFLOAD', mode)
+        monkeypatch.setitem(app.config, 'USE_X_SENDFILE', mode == 'x-sendfile')
+    set_mode('')
+    return set_mode
+
+
+def test_full_download(client, download_url, offload):
+    response = client.get(download_url)
+    assert response.status_code == 200
+    assert response.data == PDF_BYTES
+    assert response.headers['Accept-Ranges'] == 'bytes'
+    assert response.headers['Content-Disposition'] == 'attachment; filename=Intro_to_Biology.pdf'
+    assert response.get_etag() == ('ab' * 32, False)
+    assert 'private' in response.headers['Cache-Control']
+
+
+def test_range_request_returns_partial_content(client, download_url, offload):
+    response = client.get(download_url, headers={'Range': 'bytes=100-199'})
+    assert response.status_code == 206
+    assert response.data == PDF_BYTES[100:200]
+    assert response.headers['Content-Range'] == f'bytes 100-199/{len(PDF_BYTES)}'
+    assert 'Content-Encoding' not in response.headers
+
+
+@pytest.mark.parametrize('validator', ['If-None-Match', 'If-Modified-Since'])
+def test_conditional_get_returns_not_modified(client, download_url, offload, validator):
+    first = client.get(download_url)
+    value = first.headers['ETag'] if validator == 'If-None-Match' else first.headers['Last-Modified']
+    response = client.get(download_url, headers={validator: value})
+    assert response.status_code == 304
+    assert response.data == b''
+
+
+def test_x_accel_redirect_hands_the_file_to_nginx(client, download_url, offload):
+    offload('x-accel')
+    response = client.get(download_url)
+    assert response.status_code == 200
+    assert response.data == b''
+    assert response.headers['X-Accel-Redirect'] == f"/protected-uploads/{'ab' * 32}.pdf"
+    assert response.headers['Content-Disposition'] == 'attachment; filename="Intro_to_Biology.pdf"'
+    assert response.mimetype == 'application/pdf'
+
+
+def test_x_sendfile_names_the_file_for_the_server(app, client, download_url, offload):
+    offload('x-sendfile')
+    response = client.get(download_url)
+    assert response.status_code == 200
+    assert response.data == b''
+    assert response.headers['X-Sendfile'] == os.path.abspath(
+        os.path.join(app.config['UPLOAD_FOLDER'], f"{'ab' * 32}.pdf"))
+
+
+def test_other_users_cannot_download(app, download_url, offload):
+    other = app.test_client()
+    other.post('/register', data={'username': 'other', 'email': 'other@example.com', 'password': 'secret'})
+    other.post('/login', data={'username': 'other', 'password': 'secret'})
+    for mode in ('', 'x-accel', 'x-sendfile'):
+        offload(mode)
+        response = other.get(download_url)
+        assert response.status_code == 302
+        assert 'X-Accel-Redirect' not in response.headers and 'X-Sendfile' not in response.headers
+
@@ -0,0 +1,90 @@
+"""Generation requests only conflict with writes that invalidate their input."""
+import json
+
+import pytest
+from sqlalchemy import insert, update
+
+from conftest import app_module, db
+
+Syllabus, Note, Assignment = app_module.Syllabus, app_module.Note, app_module.Assignment
+
+NOTES = {"title": "Notes", "topics": [{"title": "Cells", "subtopics": [
+    {"title": "Membranes", "content": "Lipids", "key_points": ["a"], "examples": ["b"], "summary": "c"}
+]}]}
+
+ASSIGNMENT = {"title": "Quiz", "description": "Cells", "topics": [{"title": "Cells", "subtopics": [
+    {"title": "Membranes", "questions": [{"type": "short_answer", "text": "Q", "correct_answer": "A", "points": 1}]}
+]}]}
+
+
+@pytest.fixture
+def syllabus_id(app, user_id):
+    with app.app_context():
+        syllabus = Syllabus(title='Biology', content='Cells', content_html='<p>Cells</p>', user_id=user_id)
+        db.session.add(syllabus)
+        db.session.commit()
+        return syllabus.id
+
+
+def notes_reply_after(app, write):
+    """LLM handler that runs ``write`` on another connection before replying,
+    as a concurrent request would while the notes are being generated."""
+    def handler(**request):
+        with app.app_context(), db.engine.begin() as connection:
+            write(connection)
+        return json.dumps(NOTES)
+    return handler
+
+
+def test_notes_and_assignment_generated_concurrently_both_succeed(app, client, syllabus_id, fake_llm):
+    assignment_responses = []
+
+    def handler(**request):
+        if 'study notes' in request['messages'][0]['content']:
+            # The assignment request starts and finishes while the notes call is in flight
+            assignment_responses.append(client.post('/generate_assignment', json={'syllabus_id': syllabus_id}))
+            return json.dumps(NOTES)
+        return json.dumps(ASSIGNMENT)
+
+    fake_llm.handler = handler
+    response = client.post('/generate_notes', json={'syllabus_id': syllabus_id})
+    assert [r.status_code for r in assignment_responses] == [200]
+    assert response.status_code == 200
+    with app.app_context():
+        assert Note.query.filter_by(syllabus_id=syllabus_id).count() == 1
+        assert Assignment.query.filter_by(syllabus_id=syllabus_id).count() == 1
+
+
+@pytest.mark.parametrize('write', [
+    lambda connection, syllabus_id: connection.execute(
+        update(Syllabus).where(Syllabus.id == syllabus_id).values(version_id=Syllabus.version_id + 1)),
+    lambda connection, syllabus_id: (
+        connection.execute(update(Syllabus).where(Syllabus.id == syllabus_id)
+                           .values(notes_version=Syllabus.notes_version + 1)),
+        connection.execute(insert(Note).values(title='Other', content='c', syllabus_id=syllabus_id))),
+], ids=['syllabus rewritten', 'notes generated twice'])
+def test_notes_generation_conflicts_with_invalidating_writes(app, client, syllabus_id, fake_llm, write):
+    fake_llm.handler = notes_reply_after(app, lambda connection: write(connection, syllabus_id))
+    response = client.post('/generate_notes', json={'syllabus_id': syllabus_id})
+    assert response.status_code == 409
+    with app.app_context():
+        assert Note.query.filter_by(syllabus_id=syllabus_id).count() <= 1
+
+
+def test_overlapping_notes_requests_save_one_set(app, client, syllabus_id, fake_llm):
+    inner_responses = []
+    calls = []
+
+    def handler(**request):
+        calls.append(request)
+        if len(calls) == 1:
+            # A second notes request runs start to finish while the first waits on the LLM
+            inner_responses.append(client.post('/generate_notes', json={'syllabus_id': syllabus_id}))
+        return json.dumps(NOTES)
+
+    fake_llm.handler = handler
+    response = client.post('/generate_notes', json={'syllabus_id': syllabus_id})
+    assert [r.status_code for r in inner_responses] == [200]
+    assert response.status_code == 409
+    with app.app_context():
+        assert Note.query.filter_by(syllabus_id=syllabus_id).count() == 1
@@ -0,0 +1,73 @@
+"""The listing and child-row queries each resolve to one of the composite indexes."""
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from conftest import app_module, db
+
+Syllabus, Note, Assignment, Question = app_module.Syllabus, app_module.Note, app_module.Assignment, app_module.Question
+Todo, StudyPlan = app_module.Todo, app_module.StudyPlan
+
+
+@pytest.fixture
+def seeded(app, user_id):
+    now = datetime.utcnow()
+    with app.app_context():
+        syllabus = Syllabus(title='Biology', content='Cells', content_html='<p>Cells</p>', user_id=user_id)
+        db.session.add(syllabus)
+        db.session.flush()
+        db.session.add(Note(title='Note', content='c', syllabus_id=syllabus.id, topic='T', subtopic='S'))
+        assignment = Assignment(title='Quiz', due_date=now + timedelta(days=2), user_id=user_id, syllabus_id=syllabus.id)
+        db.session.add(assignment)
+        db.session.flush()
+        db.session.add(Question(assignment_id=assignment.id, question_type='short_answer', question_text='Q', correct_answer='A'))
+        db.session.add(Todo(title='Read', due_date=now + timedelta(days=1), priority=2, user_id=user_id))
+        db.session.add(StudyPlan(title='Plan', start_date=now, end_date=now + timedelta(days=7), user_id=user_id, content={}))
+        db.session.commit()
+        return {'syllabus_id': syllabus.id, 'assignment_id': assignment.id,
+                'start': (now - timedelta(days=30)).date().isoformat(),
+                'end': (now + timedelta(days=30)).date().isoformat()}
+
+
+def query_plans(app, client, url, table, column):
+    """Run GET ``url`` and return the EXPLAIN QUERY PLAN text of every SELECT
+    on ``table`` that filters on ``table.column``."""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if (statement.lstrip().startswith('SELECT')
+                and re.search(rf'\bFROM {table}\b', statement)
+                and f'{table}.{column} ' in statement.split('WHERE', 1)[-1]):
+            captured.append((statement, parameters))
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        assert client.get(url).status_code == 200
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+    assert captured, f'GET {url} ran no query on {table}.{column}'
+    with app.app_context(), engine.connect() as connection:
+        return [
+            ' | '.join(row[-1] for row in connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters))
+            for statement, parameters in captured
+        ]
+
+
+@pytest.mark.parametrize('url, table, column, index', [
+    ('/syllabi', 'syllabus', 'user_id', 'ix_syllabus_user_id_created_at'),
+    ('/assignments', 'assignment', 'user_id', 'ix_assignment_user_id_due_date'),
+    ('/todos', 'todo', 'user_id', 'ix_todo_user_id_priority_due_date'),
+    ('/study-plans', 'study_plan', 'user_id', 'ix_study_plan_user_id_created_at'),
+    ('/calendar/events?start={start}&end={end}', 'todo', 'user_id', 'ix_todo_user_id_due_date'),
+    ('/calendar/events?start={start}&end={end}', 'assignment', 'user_id', 'ix_assignment_user_id_due_date'),
+    ('/syllabi/{syllabus_id}', 'note', 'syllabus_id', 'ix_note_syllabus_id_order'),
+    ('/assignments/{assignment_id}', 'question', 'assignment_id', 'ix_question_assignment_id_order'),
+])
+def test_query_uses_index(app, client, seeded, url, table, column, index):
+    for plan in query_plans(app, client, url.format(**seeded), table, column):
+        assert re.search(rf'USING (COVERING )?INDEX {index}\b', plan), plan
@@ -0,0 +1,87 @@
+"""Ingestion jobs are taken over once their owner stops heartbeating, and never while it is alive."""
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from conftest import app_module, db
+
+Syllabus = app_module.Syllabus
+
+
+@pytest.fixture
+def make_job(app, user_id):
+    def make(status, owner, heartbeat_age, updated_age=0):
+        now = datetime.now(timezone.utc)
+        with app.app_context():
+            syllabus = Syllabus(
+                title='Course', extracted_text='Course text', user_id=user_id, status=status,
+                status_updated_at=now - timedelta(seconds=updated_age),
+                job_owner=owner,
+                job_heartbeat_at=None if heartbeat_age is None else now - timedelta(seconds=heartbeat_age)
+            )
+            db.session.add(syllabus)
+            db.session.commit()
+            return syllabus.id
+    return make
+
+
+def stale_age(app):
+    return app.config['INGESTION_STALE_AFTER'] * 2
+
+
+def status(app, syllabus_id):
+    with app.app_context():
+        return db.session.get(Syllabus, syllabus_id).status
+
+
+def sweep(app):
+    with app.app_context():
+        app_module.requeue_stale_ingestion_jobs()
+
+
+def wait_for_ready(app, syllabus_id):
+    for _ in range(200):
+        if status(app, syllabus_id) == 'ready':
+            return
+        time.sleep(0.05)
+    pytest.fail('ingestion did not finish')
+
+
+@pytest.mark.parametrize('heartbeat_age', ['stale', None])
+def test_orphaned_job_is_taken_over_whatever_its_age(app, fake_llm, make_job, heartbeat_age):
+    fake_llm.handler = lambda **request: 'Summary'
+    # Cut off mid-run by a restart a moment ago: status_updated_at is recent
+    syllabus_id = make_job('summarizing', 'gone', stale_age(app) if heartbeat_age else None)
+    sweep(app)
+    wait_for_ready(app, syllabus_id)
+    with app.app_context():
+        assert db.session.get(Syllabus, syllabus_id).job_owner == app_module.ingestion_owner()
+
+
+def test_long_running_job_with_a_live_owner_is_left_alone(app, fake_llm, make_job):
+    syllabus_id = make_job('summarizing', 'other-worker', heartbeat_age=1, updated_age=3600)
+    sweep(app)
+    assert status(app, syllabus_id) == 'summarizing'
+    assert fake_llm.calls == []
+
+
+def test_heartbeat_keeps_this_processes_jobs_alive(app, fake_llm, make_job):
+    with app.app_context():
+        owner = app_module.ingestion_owner()
+    syllabus_id = make_job('summarizing', owner, stale_age(app))
+    with app.app_context():
+        app_module.heartbeat_ingestion_jobs()
+    sweep(app)
+    assert status(app, syllabus_id) == 'summarizing'
+    assert fake_llm.calls == []
+
+
+def test_retry_accepts_a_stalled_job_but_not_a_live_one(app, client, fake_llm, make_job):
+    fake_llm.handler = lambda **request: 'Summary'
+    live = make_job('extracting', 'other-worker', heartbeat_age=1)
+    stalled = make_job('extracting', 'gone', stale_age(app))
+    assert client.post(f'/syllabi/{live}/retry').status_code == 409
+    assert client.post(f'/syllabi/{stalled}/retry').status_code == 202
+    wait_for_ready(app, stalled)
+    assert status(app, live) == 'extracting'
@@ -0,0 +1,84 @@
+"""LLMCache expiry, eviction and failing open when the SQLite tier is unusable."""
+import sqlite3
+
+import pytest
+
+import llm_cache
+from llm_cache import LLMCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freeze the cache's clock; advance it with ``clock.now += seconds``."""
+    class Clock:
+        now = 1000.0
+    monkeypatch.setattr(llm_cache.time, 'time', lambda: Clock.now)
+    return Clock
+
+
+def test_entries_expire_after_the_ttl(tmp_path, clock):
+    cache = LLMCache(path=str(tmp_path / 'cache.db'), ttl=60)
+    cache.set('key', 'value')
+    clock.now += 59
+    assert cache.get('key') == 'value'
+    clock.now += 2
+    assert cache.get('key') is None
+    # Neither tier serves it: a new process sharing the file misses too
+    assert LLMCache(path=cache.path, ttl=60).get('key') is None
+
+
+def test_memory_tier_evicts_the_least_recently_used_entry():
+    cache = LLMCache(max_entries=2)
+    cache.set('a', '1')
+    cache.set('b', '2')
+    cache.get('a')
+    cache.set('c', '3')
+    assert cache.get('b') is None
+    assert cache.get('a') == '1'
+    assert cache.get('c') == '3'
+
+
+def test_disk_tier_is_trimmed_by_least_recent_use(tmp_path, clock, monkeypatch):
+    monkeypatch.setattr(llm_cache, 'DISK_TRIM_INTERVAL', 1)
+    monkeypatch.setattr(llm_cache, 'DISK_TOUCH_BATCH', 1)
+    cache = LLMCache(path=str(tmp_path / 'cache.db'), max_entries=1, disk_max_entries=2)
+    cache.set('a', '1')
+    clock.now += 1
+    cache.set('b', '2')
+    clock.now += 1
+    assert cache.get('a') == '1'  # Read back from disk, which marks it used
+    clock.now += 1
+    cache.set('c', '3')
+    fresh = LLMCache(path=cache.path)
+    assert fresh.get('b') is None
+    assert fresh.get('a') == '1'
+    assert fresh.get('c') == '3'
+
+
+def test_a_locked_file_falls_back_to_memory(tmp_path):
+    cache = LLMCache(path=str(tmp_path / 'cache.db'), busy_timeout=0.01)
+    cache.set('before', 'value')
+    other = sqlite3.connect(cache.path)
+    other.execute('BEGIN EXCLUSIVE')
+    try:
+        cache.set('during', 'value')
+        cache.clear()
+    finally:
+        other.rollback()
+        other.close()
+    assert cache.disk_errors == 2
+    assert cache.stats()['disk_entries'] == 1  # The clear did not reach the file
+
+
+def test_a_broken_file_counts_as_a_miss(tmp_path):
+    path = tmp_path / 'cache.db'
+    path.write_bytes(b'not a database' * 512)
+    cache = LLMCache(path=str(path))
+    cache.set('key', 'value')
+    assert cache.get('key') == 'value'
+    assert cache.get('other') is None
+    stats = cache.stats()
+    assert stats['disk_entries'] is None
+    cache.clear()
+    assert cache.stats()['misses'] == 1
+    assert cache.disk_errors >= 4
@@ -0,0 +1,74 @@
+"""LLMGateway retries, circuit breaker and in-flight slots, run offline over FakeTransport."""
+import pytest
+
+from llm_gateway import (
+    CircuitBreaker, CircuitOpenError, FakeTransport, LLMGateway, LLMUnavailableError, TransportError
+)
+
+
+def scripted_gateway(replies, max_in_flight=16, **breaker):
+    """Gateway over a FakeTransport that answers with ``replies`` in order."""
+    replies = iter(replies)
+    transport = FakeTransport(lambda **request: next(replies))
+    gateway = LLMGateway(transport, max_retries=2, backoff_base=0, backoff_max=0,
+                         max_in_flight=max_in_flight, acquire_timeout=0.01, breaker=CircuitBreaker(**breaker))
+    return gateway, transport
+
+
+def complete(gateway, **kwargs):
+    return gateway.chat_completion('chat', model='o4-mini', messages=[], **kwargs)
+
+
+def test_transient_errors_are_retried():
+    gateway, transport = scripted_gateway([TransportError(503), TransportError(429), 'done'])
+    assert complete(gateway).choices[0].message.content == 'done'
+    assert len(transport.calls) == 3
+    assert gateway.breaker.state == 'closed'
+
+
+def test_client_errors_are_not_retried():
+    gateway, transport = scripted_gateway([TransportError(400), 'unused'])
+    with pytest.raises(TransportError):
+        complete(gateway)
+    assert len(transport.calls) == 1
+    assert gateway.breaker.state == 'closed'
+
+
+def test_breaker_opens_and_fails_fast():
+    gateway, transport = scripted_gateway([TransportError(503)] * 6, failure_threshold=2, reset_timeout=60)
+    for _ in range(2):
+        with pytest.raises(TransportError):
+            complete(gateway)
+    assert len(transport.calls) == 6
+    assert gateway.breaker.state == 'open'
+    with pytest.raises(CircuitOpenError):
+        complete(gateway)
+    assert len(transport.calls) == 6
+
+
+def test_breaker_lets_one_trial_through_after_reset():
+    gateway, transport = scripted_gateway([TransportError(503)] * 3 + ['recovered'], failure_threshold=1, reset_timeout=0)
+    with pytest.raises(TransportError):
+        complete(gateway)
+    assert gateway.breaker.state == 'half-open'
+    assert complete(gateway).choices[0].message.content == 'recovered'
+    assert gateway.breaker.state == 'closed'
+
+
+def test_slots_are_released_after_calls_and_failures():
+    gateway, transport = scripted_gateway([TransportError(400), 'a', 'b'], max_in_flight=1)
+    with pytest.raises(TransportError):
+        complete(gateway)
+    assert complete(gateway).choices[0].message.content == 'a'
+    assert complete(gateway).choices[0].message.content == 'b'
+
+
+def test_stream_holds_its_slot_until_read_or_closed():
+    gateway, transport = scripted_gateway(['one two', 'three', 'four'], max_in_flight=1)
+    stream = complete(gateway, stream=True)
+    with pytest.raises(LLMUnavailableError):
+        complete(gateway)
+    assert [chunk.choices[0].delta.content for chunk in stream] == ['one ', 'two ']
+    stream = complete(gateway, stream=True)
+    stream.close()
+    assert complete(gateway).choices[0].message.content == 'four'
@@ -0,0 +1,35 @@
+"""Page cursors are client input: anything but the columns' own types is a 400."""
+import base64
+import json
+
+import pytest
+
+from conftest import app_module
+
+
+def cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+@pytest.mark.parametrize('values', [
+    ['2026-10-01T00:00:00', {'x': 1}],
+    ['2026-10-01T00:00:00', '7'],
+    ['2026-10-01T00:00:00', True],
+    ['2026-10-01T00:00:00', 1.5],
+    ['2026-10-01T00:00:00', None],
+    [20261001, 7],
+    [['2026-10-01'], 7],
+    ['not a date', 7],
+    ['2026-10-01T00:00:00'],
+])
+def test_malformed_cursor_is_rejected(client, values):
+    response = client.get(f'/todos?format=json&high_cursor={cursor(values)}')
+    assert response.status_code == 400
+    assert response.json == {"error": "Invalid page cursor"}
+
+
+def test_valid_cursor_round_trips(client):
+    for values in (['2026-10-01T00:00:00', 7], [None, 7]):
+        assert client.get(f'/todos?format=json&high_cursor={cursor(values)}').status_code == 200
+    with pytest.raises(ValueError):
+        app_module.decode_cursor('%%%', [app_module.Todo.id])
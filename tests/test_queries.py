@@ -0,0 +1,69 @@
+"""Per-request query counts stay flat however many child rows a page shows."""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import app_module, db
+
+Syllabus, Note, Assignment, Question = app_module.Syllabus, app_module.Note, app_module.Assignment, app_module.Question
+
+
+def add_syllabus(user_id, children):
+    syllabus = Syllabus(title='Biology', content='Cells', content_html='<p>Cells</p>', user_id=user_id)
+    db.session.add(syllabus)
+    db.session.flush()
+    db.session.add_all(
+        Note(title=f'Note {i}', content='c', content_html='<p>c</p>', syllabus_id=syllabus.id,
+             topic=f'Topic {i}', subtopic=f'Subtopic {i}', order=i)
+        for i in range(children)
+    )
+    assignment = Assignment(title='Quiz', description='d', due_date=datetime.utcnow() + timedelta(days=3),
+                            user_id=user_id, syllabus_id=syllabus.id)
+    db.session.add(assignment)
+    db.session.flush()
+    db.session.add_all(
+        Question(assignment_id=assignment.id, question_type='multiple_choice', question_text=f'Q{i}',
+                 options=['a', 'b'], correct_answer='a', order=i)
+        for i in range(children)
+    )
+    db.session.commit()
+    return syllabus.id, assignment.id
+
+
+def queries_for(app, client, count_queries, user_id, children, request):
+    with app.app_context():
+        syllabus_id, assignment_id = add_syllabus(user_id, children)
+    with count_queries() as statements:
+        response = request(client, syllabus_id, assignment_id)
+    assert response.status_code == 200
+    return len(statements)
+
+
+@pytest.mark.parametrize('request_page', [
+    lambda client, syllabus_id, assignment_id: client.get(f'/syllabi/{syllabus_id}'),
+    lambda client, syllabus_id, assignment_id: client.get(f'/assignments/{assignment_id}'),
+], ids=['view_syllabus', 'view_assignment'])
+def test_detail_pages_load_children_in_constant_queries(app, client, user_id, count_queries, request_page):
+    few = queries_for(app, client, count_queries, user_id, 1, request_page)
+    many = queries_for(app, client, count_queries, user_id, 25, request_page)
+    assert many == few
+    # The user, the parent row and one IN query for its children
+    assert few <= 3
+
+
+def test_generate_study_plan_queries_do_not_grow_with_inputs(app, client, user_id, count_queries, fake_llm):
+    plan = {"title": "Plan", "days": [{"date": "2026-01-05", "sessions": []}]}
+    fake_llm.handler = lambda **request: json.dumps(plan)
+
+    def generate(client, syllabus_id, assignment_id):
+        return client.post('/generate-study-plan', json={'start_date': '2026-01-05', 'end_date': '2026-01-11'})
+
+    few = queries_for(app, client, count_queries, user_id, 1, generate)
+    many = queries_for(app, client, count_queries, user_id, 25, generate)
+    assert many == few
+    assert len(fake_llm.calls) == 2
+    prompt = json.loads(fake_llm.calls[-1]['messages'][1]['content'])
+    assert len(prompt['syllabi']) == 2
+    assert len(prompt['syllabi'][0]['topics']) == 1
+    assert len(prompt['syllabi'][1]['topics']) == 25
@@ -0,0 +1,86 @@
+"""Content-addressed uploads survive cleanup of an earlier syllabus with the same PDF."""
+import os
+import time
+
+import pytest
+
+from conftest import app_module, db
+
+Syllabus = app_module.Syllabus
+PDF = os.path.join(os.path.dirname(__file__), os.pardir, 'testing', '596945-2023-2025-syllabus.pdf')
+
+
+def upload(client):
+    with open(PDF, 'rb') as pdf:
+        response = client.post('/syllabi', data={'file': (pdf, 'course.pdf'), 'title': 'Course'},
+                               content_type='multipart/form-data')
+    assert response.status_code == 202
+    for _ in range(200):
+        status = client.get(response.json['status_url']).json['status']
+        if status in ('ready', 'failed'):
+            return response.json['job_id']
+        time.sleep(0.05)
+    pytest.fail('ingestion did not finish')
+
+
+@pytest.fixture
+def stored(app, client, fake_llm, monkeypatch):
+    # Tests call delete_upload themselves instead of racing the background queue
+    monkeypatch.setattr(app_module, 'enqueue_cleanup', lambda description, action, *args: None)
+    fake_llm.handler = lambda **request: 'Summary'
+    syllabus_id = upload(client)
+    with app.app_context():
+        file_path = db.session.get(Syllabus, syllabus_id).file_path
+    return syllabus_id, file_path
+
+
+def leftovers(app):
+    return [name for name in os.listdir(app.config['UPLOAD_FOLDER']) if not name.endswith('.pdf')]
+
+
+def test_upload_is_stored_under_its_hash(app, stored):
+    syllabus_id, file_path = stored
+    with app.app_context():
+        content_hash = db.session.get(Syllabus, syllabus_id).content_hash
+    assert os.path.basename(file_path) == f'{content_hash}.pdf'
+    assert os.path.exists(file_path)
+    assert leftovers(app) == []
+
+
+def test_cleanup_keeps_a_file_another_syllabus_uses(app, client, stored):
+    syllabus_id, file_path = stored
+    upload(client)
+    client.delete(f'/syllabi/{syllabus_id}/delete')
+    app_module.delete_upload(file_path)
+    assert os.path.exists(file_path)
+
+
+def test_cleanup_removes_an_unused_file(app, client, stored):
+    syllabus_id, file_path = stored
+    client.delete(f'/syllabi/{syllabus_id}/delete')
+    app_module.delete_upload(file_path)
+    assert not os.path.exists(file_path)
+    assert leftovers(app) == []
+
+
+def test_upload_committed_while_cleanup_runs_keeps_its_file(app, client, stored, monkeypatch):
+    syllabus_id, file_path = stored
+    client.delete(f'/syllabi/{syllabus_id}/delete')
+    real_upload_in_use = app_module.upload_in_use
+    checks = []
+
+    def upload_lands_after_first_check(path):
+        checks.append(path)
+        if len(checks) == 1:
+            # Cleanup saw no row; a new upload of the same PDF now commits its row
+            with app.app_context():
+                db.session.add(Syllabus(title='Again', file_path=path, user_id=1))
+                db.session.commit()
+            return False
+        return real_upload_in_use(path)
+
+    monkeypatch.setattr(app_module, 'upload_in_use', upload_lands_after_first_check)
+    app_module.delete_upload(file_path)
+    assert len(checks) == 2
+    assert os.path.exists(file_path)
+    assert leftovers(app) == []
@@ -0,0 +1,84 @@
+"""Token-aware splitting of long syllabus text.
+
+Text is cut on blank-line boundaries (which include every PDF page break) and
+packed greedily into chunks under a token budget. A block that looks like a
+section heading starts a new chunk once the current one is reasonably full, so
+units/weeks/chapters tend to stay together. Blocks that are too large on
+their own fall back to line, then character, splits.
+"""
+import math
+import re
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding('o200k_base')
+except Exception:  # tiktoken is optional; fall back to ~4 characters per token
+    _encoding = None
+
+# Break before a heading once a chunk holds at least this fraction of the budget
+SECTION_BREAK_FILL = 0.5
+
+HEADING_PATTERN = re.compile(
+    r'^\s*(#{1,6}\s|(unit|module|week|chapter|section|topic|part|lesson)\s+\w+|\d+(\.\d+)*[.)]?\s+[A-Z])',
+    re.IGNORECASE
+)
+
+
+def count_tokens(text):
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+
+def chunk_text(text, max_tokens):
+    """Split ``text`` into chunks of at most roughly ``max_tokens`` tokens, in order."""
+    blocks = [block.strip() for block in re.split(r'\n\s*\n', text or '') if block.strip()]
+    chunks = []
+    current = []
+    current_tokens = 0
+
+    def flush():
+        nonlocal current, current_tokens
+        if current:
+            chunks.append("\n\n".join(current))
+        current = []
+        current_tokens = 0
+
+    for block in blocks:
+        tokens = count_tokens(block)
+        if tokens > max_tokens:
+            flush()
+            chunks.extend(_split_oversized(block, max_tokens))
+            continue
+        starts_section = bool(HEADING_PATTERN.match(block))
+        if current and (current_tokens + tokens > max_tokens
+                        or (starts_section and current_tokens >= max_tokens * SECTION_BREAK_FILL)):
+            flush()
+        current.append(block)
+        current_tokens += tokens
+    flush()
+    return chunks
+
+
+def _split_oversized(block, max_tokens):
+    chunks = []
+    current = []
+    current_tokens = 0
+    for line in block.splitlines():
+        tokens = count_tokens(line)
+        if tokens > max_tokens:
+            if current:
+                chunks.append("\n".join(current))
+                current, current_tokens = [], 0
+            # A single enormous line: cut it by characters
+            width = max(1, len(line) * max_tokens // tokens)
+            chunks.extend(line[start:start + width] for start in range(0, len(line), width))
+            continue
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append("\n".join(current))
+            current, current_tokens = [], 0
+        current.append(line)
+        current_tokens += tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks